@@ -0,0 +1,247 @@
+"""
+Benchmark for player collisions
+
+Builds levels of rolling ground with one collider per column, from a
+thousand to a hundred thousand colliders, and times Player.update while the
+input script of the level render benchmark plays. Every level is played
+with the collision world of merged edge spans and with a scan over every
+collider, the way collisions used to be handled. The player starts in the
+middle of the level and both play the same game. Besides the time, the
+number of edge rectangles before and after merging and the edge tests per
+frame are printed. The cost of many actors is measured with
+CollisionWorld.overlaps queries for player-sized rectangles spread over the
+ground of the whole level.
+
+Finally the player is dropped onto a floor and walked into a wall at low
+tick rates, where a tick moves it further than its own size, with and
+without the swept movement and substeps of Player.update.
+
+Usage:
+    python -m benchmarks.collisions [--colliders 1000 10000 100000] [--frames 1200] [--actors 1000]
+                                    [--tick-rates 60 20 5 2]
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from benchmarks.generate_level import get_ground
+from benchmarks.level_render import FRAME_TIME, ScriptedKeys, get_input_frames
+from src.editor.settings import TILE_SIZE
+from src.settings import PLAYER_WIDTH, PLAYER_HEIGHT
+from src.game.collision import CollisionWorld
+from src.game.level import Collider
+from src.game.player import Player
+
+
+class FullScan(CollisionWorld):
+    """
+    Hands every collider to the player, like the level did before the broadphase.
+
+    Sweeps with the logic of the collision world over every span instead of
+    the chunks around the move, so only the broadphase differs.
+    """
+
+    def __init__(self, tile_size, colliders=()):
+        self.colliders = list(colliders)
+        super().__init__(tile_size, self.colliders)
+        self.all_spans = np.arange(len(self.spans), dtype=np.intp)
+
+    def overlaps(self, rect, margin=0):
+        left, top = rect.left - margin, rect.top - margin
+        right, bottom = rect.right + margin, rect.bottom + margin
+        mask = (self.x0 < right) & (self.x1 > left) & (self.y0 < bottom) & (self.y1 > top)
+        return self.all_spans[mask]
+
+    def query(self, rect, margin=1):
+        return self.colliders
+
+
+class CountingQuery:
+    """Counts the edge rectangles the player tests through a world or scan"""
+
+    def __init__(self, colliders):
+        self.colliders = colliders
+        self.tile_size = colliders.tile_size
+        self.sweep = colliders.sweep
+        self.tests = 0
+
+    def query(self, rect, margin=1):
+        found = self.colliders.query(rect, margin)
+        self.tests += sum(get_edge_count(item) for item in found)
+        return found
+
+
+def get_edge_count(item):
+    """Get the number of edge rectangles of a collider or span"""
+    return len(item.rects) if isinstance(item, Collider) else 1
+
+
+def create_colliders(count, seed=0):
+    """
+    Create one collider per column on the cell above a random walk ground.
+
+    Returns:
+        tuple: The colliders by coords and the ground height of every column in cells.
+    """
+    ground = get_ground(count, random.Random(seed))
+    colliders = {}
+    for column, height in enumerate(ground):
+        collider_type = ''
+        if column > 0 and ground[column - 1] < height:
+            collider_type += 'l'
+        if column < count - 1 and ground[column + 1] < height:
+            collider_type += 'r'
+        pos = (column * TILE_SIZE, (height - 1) * TILE_SIZE)
+        colliders[pos] = Collider(9, pos, collider_type + 'd', TILE_SIZE)
+    return colliders, ground
+
+
+def play(colliders, ground, frames):
+    """
+    Play the input script from the middle of the level.
+
+    Returns:
+        tuple: The Player.update times in milliseconds and the final player rect.
+    """
+    column = len(ground) // 2
+    player = Player()
+    player.rect.midbottom = (column * TILE_SIZE + TILE_SIZE // 2, ground[column] * TILE_SIZE - TILE_SIZE)
+    player.start_width = 0
+    player.end_width = len(ground) * TILE_SIZE
+
+    times = []
+    for keys in get_input_frames(frames):
+        player.event_loop(keys)
+        start = time.perf_counter()
+        player.update(colliders, FRAME_TIME)
+        times.append((time.perf_counter() - start) * 1000)
+    return times, list(player.rect)
+
+
+def time_actors(world, ground, actors, seed=0):
+    """
+    Query the world for actors standing on random columns of the ground.
+
+    Returns:
+        float: The time of one query in microseconds.
+    """
+    rng = random.Random(seed)
+    rects = []
+    for _ in range(actors):
+        column = rng.randrange(len(ground))
+        rect = pygame.Rect(0, 0, PLAYER_WIDTH, PLAYER_HEIGHT)
+        rect.midbottom = (column * TILE_SIZE + TILE_SIZE // 2, ground[column] * TILE_SIZE)
+        rects.append(rect)
+
+    start = time.perf_counter()
+    for rect in rects:
+        world.overlaps(rect)
+    return (time.perf_counter() - start) / actors * 1_000_000
+
+
+class UnsweptWorld(CollisionWorld):
+    """Collision world that moves without sweeping, for comparison"""
+
+    def sweep(self, start, end):
+        return end
+
+
+class UnsteppedPlayer(Player):
+    """Player that never splits a tick into substeps, for comparison"""
+
+    def _get_substeps(self, tile_size, dt):
+        return 1
+
+
+def run_tunnel_tests(tick_rate):
+    """
+    Drop the player onto a floor and walk it into a wall at a tick rate.
+
+    The floor is a row of 'd' colliders with its edge at y = TILE_SIZE, the
+    wall the right edge of the last collider of the row.
+
+    Returns:
+        dict: (swept, unswept) -> the bottom of the player after the drop and its right side after the walk.
+    """
+    columns = 30
+    colliders = [Collider(9, (column * TILE_SIZE, 0), 'rd' if column == columns - 1 else 'd', TILE_SIZE)
+                 for column in range(columns)]
+    idle, walk = ScriptedKeys(()), ScriptedKeys(('d',))
+    tick = 1 / tick_rate
+
+    results = {}
+    for name, world, player_class in (('swept', CollisionWorld(TILE_SIZE, colliders), Player),
+                                      ('unswept', UnsweptWorld(TILE_SIZE, colliders), UnsteppedPlayer)):
+        player = player_class()
+        player.start_width = 0
+        player.end_width = columns * TILE_SIZE * 2
+        player.rect.midbottom = (TILE_SIZE * 2, -20 * TILE_SIZE)
+        player.direction.y = player.terminal_velocity
+
+        for keys in [idle] * (3 * tick_rate) + [walk] * (10 * tick_rate):
+            player.event_loop(keys)
+            player.update(world, tick)
+            if keys is idle:
+                bottom = player.rect.bottom
+        results[name] = (bottom, player.rect.right)
+    return results
+
+
+def describe(times):
+    """Format the mean, 95th percentile and worst update time"""
+    times = sorted(times)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    return f'{statistics.mean(times):8.4f} mean {p95:8.4f} p95 {times[-1]:8.4f} max ms'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--colliders', type=int, nargs='*', default=[1000, 10_000, 100_000])
+    parser.add_argument('--frames', type=int, default=1200)
+    parser.add_argument('--actors', type=int, default=1000, help='rectangles queried per level')
+    parser.add_argument('--tick-rates', type=int, nargs='*', default=[60, 20, 5, 2])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    for count in args.colliders:
+        colliders, ground = create_colliders(count, args.seed)
+        start = time.perf_counter()
+        world = CollisionWorld(TILE_SIZE, colliders.values())
+        build_ms = (time.perf_counter() - start) * 1000
+
+        world_times, world_rect = play(world, ground, args.frames)
+        scan_times, scan_rect = play(FullScan(TILE_SIZE, colliders.values()), ground, args.frames)
+
+        # Edge tests of a separate run, counting slows the timed runs down
+        counting = CountingQuery(world)
+        play(counting, ground, args.frames)
+        edges = sum(get_edge_count(collider) for collider in colliders.values())
+
+        print(f'{count} colliders, {edges} edges merged into {len(world)} spans (world built in {build_ms:.1f} ms)')
+        print(f'{"world":>8}: {describe(world_times)}  {counting.tests / args.frames:.1f} edge tests per frame')
+        print(f'{"scan":>8}: {describe(scan_times)}  {edges} edge tests per frame')
+        print(f'{"actors":>8}: {time_actors(world, ground, args.actors, args.seed):8.2f} us per overlaps query')
+        if world_rect != scan_rect:
+            print(f'Warning: the player ended at {world_rect} with the world and at {scan_rect} with the scan')
+
+    print(f'tunneling: floor edge at y {TILE_SIZE}, wall at x {30 * TILE_SIZE}')
+    for tick_rate in args.tick_rates:
+        results = run_tunnel_tests(tick_rate)
+        print(f'{tick_rate:>5} ticks/s: ' + '  '.join(
+            f'{name} bottom {bottom} right {right}' for name, (bottom, right) in results.items()))
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
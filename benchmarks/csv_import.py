@@ -0,0 +1,104 @@
+"""
+Benchmark for parsing tiles.csv
+
+Compares the old row-by-row pandas lookup loop with the columnar reader of
+SaveManager on a synthetic tiles.csv and prints rows/sec for both.
+
+Usage:
+    python -m benchmarks.csv_import [--rows 100000] [--repeat 3]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+
+from src.save_manager import SaveManager, TILE_COLUMNS
+
+TILE_IMAGES = (
+    r'assets\graphics\tiles\ground\1E.png',
+    r'assets\graphics\tiles\dirty_grass\12.png',
+    r'assets\graphics\tiles\water\water_bottom.png',
+    r'assets\graphics\tiles\boards\6.png',
+)
+
+
+def write_synthetic_tiles(path, rows, seed=0):
+    """Write a tiles.csv with the given number of rows"""
+    rng = random.Random(seed)
+
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(TILE_COLUMNS)
+        for _ in range(rows):
+            coords = [rng.randrange(-2000, 2000) * 64, rng.randrange(-20, 20) * 64]
+            writer.writerow((
+                rng.randrange(4, 13), json.dumps(coords), rng.choice(TILE_IMAGES), '',
+                False, False, False, False, False, '', (64, 64)
+            ))
+
+
+def read_tiles_legacy(path):
+    """Parse tiles.csv the way SaveManager did before the columnar reader"""
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    rows = []
+    for i in range(len(df)):
+        id = df['id'][i]
+        size_str = df['size'][i]
+        rows.append((
+            df['layer'][i],
+            tuple(json.loads(df['coords'][i])),
+            df['image_path'][i],
+            df['animation_path'][i],
+            df['is_item'][i],
+            df['is_npc'][i],
+            df['is_enemy'][i],
+            df['is_player'][i],
+            df['is_event'][i],
+            id if pd.notna(id) else None,
+            tuple(map(int, size_str.strip('()').split(','))),
+        ))
+    return rows
+
+
+def measure(function, path, repeat):
+    """Return the best wall time of function(path) over repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    save_manager = SaveManager(None, None, False)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'tiles.csv')
+        write_synthetic_tiles(path, args.rows)
+
+        results = {'columnar': measure(save_manager.read_tile_columns, path, args.repeat)}
+        try:
+            results['pandas rows'] = measure(read_tiles_legacy, path, args.repeat)
+        except ImportError:
+            print('pandas is not installed, skipping the legacy reader')
+
+    for name, seconds in results.items():
+        print(f'{name:>12}: {seconds:8.3f} s  {args.rows / seconds:12,.0f} rows/sec')
+
+    if 'pandas rows' in results:
+        print(f'     speedup: {results["pandas rows"] / results["columnar"]:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Synthetic level generator
+
+Writes a scene of any size in the format the editor saves: tiles.csv,
+colliders.csv, settings.json and the compiled level.bin, all through
+SaveManager.export_columns. The level is a rolling terrain: every tile layer
+fills the columns of the level from the ground down, the colliders follow
+the ground surface, clouds are scattered over the sky and the player starts
+on the ground at the left edge. The same seed always writes the same level.
+
+Usage:
+    python -m benchmarks.generate_level <directory> [--tiles 100000] [--layers 7:0.15,8:0.25,9:0.55,10:0.05]
+                                        [--animated 0.05] [--clouds 80] [--colliders 1.0] [--seed 0]
+"""
+import argparse
+import math
+import os
+import random
+
+import pygame
+
+from src.editor.settings import TILE_SIZE
+from src.save_manager import SaveManager, TILE_COLUMNS, COLLIDER_COLUMNS
+
+# Share of the tiles on every tile layer
+DEFAULT_LAYERS: dict = {7: 0.15, 8: 0.25, 9: 0.55, 10: 0.05}
+
+# Tile graphics by layer, every image is TILE_SIZE wide and high
+LAYER_IMAGES: dict = {
+    7: tuple(rf'assets\graphics\tiles\wood\{index}.png' for index in range(1, 7)),
+    8: tuple(rf'assets\graphics\tiles\boards\{index}.png' for index in range(1, 7)),
+    9: tuple(rf'assets\graphics\tiles\ground\{index:02X}.png' for index in range(0x16, 0x20)),
+    10: tuple(rf'assets\graphics\tiles\dirty_grass\{index}.png' for index in range(1, 7)),
+}
+FALLBACK_IMAGES: tuple = LAYER_IMAGES[9]
+ANIMATED_IMAGE: str = r'assets\graphics\tiles\water\water_bottom.png'
+ANIMATION_PATH: str = r'assets\graphics\tiles\water\animation'
+
+CLOUD_IMAGES: tuple = tuple(rf'assets\graphics\clouds\Small Cloud {index}.png' for index in range(1, 4))
+BACKGROUND_IMAGES: dict = {2: r'assets\graphics\backgrounds\Background_2.png', 3: r'assets\graphics\backgrounds\Background_1.png'}
+BACKGROUND_POS: tuple = (-1024, -512)
+PLAYER_IMAGE: str = r'assets\graphics\player\idle\jekiChanIdle1.png'
+COLLIDER_IMAGE: str = r'assets\graphics\colliders\{}.png'
+
+# Level shape in cells: how far the ground may rise or sink, and how many columns a level has per tile
+GROUND_RANGE: tuple = (-4, 4)
+COLUMNS_PER_TILE: float = 0.05
+MIN_COLUMNS: int = 40
+
+_image_sizes = {}
+
+
+def parse_layers(text):
+    """Parse a '7:0.15,8:0.25' layer distribution"""
+    layers = {}
+    for item in text.split(','):
+        layer, share = item.split(':')
+        layers[int(layer)] = float(share)
+    return layers
+
+
+def get_image_size(path):
+    """Get the size of an image file, read once per path"""
+    if path not in _image_sizes:
+        _image_sizes[path] = pygame.image.load(path.replace('\\', os.sep)).get_size()
+    return _image_sizes[path]
+
+
+def get_layer_counts(tiles, layers):
+    """
+    Split the tile count over the layers by their share.
+
+    Returns:
+        dict: Layer -> number of tiles, adding up to tiles.
+    """
+    total = sum(layers.values())
+    counts = {layer: int(tiles * share / total) for layer, share in layers.items()}
+
+    # Hand out what rounding left over, largest share first
+    for layer in sorted(layers, key=layers.get, reverse=True)[:tiles - sum(counts.values())]:
+        counts[layer] += 1
+    return counts
+
+
+def get_ground(columns, rng):
+    """Get the ground height of every column as a random walk in cells, negative is higher"""
+    ground = []
+    height = 0
+    for _ in range(columns):
+        height = min(max(height + rng.choice((-1, 0, 0, 0, 1)), GROUND_RANGE[0]), GROUND_RANGE[1])
+        ground.append(height)
+    return ground
+
+
+def generate_level(path, tiles=100_000, layers=None, animated=0.05, clouds=80, colliders=1.0, seed=0):
+    """
+    Write a synthetic level.
+
+    Args:
+        path (str): The scene directory.
+        tiles (int): The number of tiles on the tile layers.
+        layers (dict): The share of the tiles of every layer, DEFAULT_LAYERS if None.
+        animated (float): The share of tiles that are animated water.
+        clouds (int): The number of clouds.
+        colliders (float): The share of ground columns with a collider on their surface.
+        seed (int): The seed of every random choice.
+
+    Returns:
+        tuple: The tile and collider columns that were written.
+    """
+    rng = random.Random(seed)
+    layers = layers or DEFAULT_LAYERS
+    counts = get_layer_counts(tiles, layers)
+
+    width = max(MIN_COLUMNS, math.ceil(tiles * COLUMNS_PER_TILE))
+    first_column = -width // 2
+    ground = get_ground(width, rng)
+
+    tile_columns = {name: [] for name in TILE_COLUMNS}
+    collider_columns = {name: [] for name in COLLIDER_COLUMNS}
+
+    def add_tile(layer, coords, image_path, animation_path=None, is_player=False):
+        tile_columns['layer'].append(layer)
+        tile_columns['coords'].append(coords)
+        tile_columns['image_path'].append(image_path)
+        tile_columns['animation_path'].append(animation_path)
+        for name in ('is_item', 'is_npc', 'is_enemy', 'is_event'):
+            tile_columns[name].append(False)
+        tile_columns['is_player'].append(is_player)
+        tile_columns['id'].append(None)
+        tile_columns['size'].append(get_image_size(image_path))
+
+    # Sky
+    for _ in range(clouds):
+        image_path = rng.choice(CLOUD_IMAGES)
+        coords = (rng.randrange(first_column, first_column + width) * TILE_SIZE + rng.randrange(TILE_SIZE),
+                  rng.randrange(-640, -128))
+        add_tile(1, coords, image_path)
+    for layer, image_path in BACKGROUND_IMAGES.items():
+        add_tile(layer, BACKGROUND_POS, image_path)
+
+    # Terrain, every layer fills the columns from the ground down, left columns get the remainder
+    for layer, count in counts.items():
+        images = LAYER_IMAGES.get(layer, FALLBACK_IMAGES)
+        depth, remainder = divmod(count, width)
+        for column in range(width):
+            for row in range(depth + (column < remainder)):
+                x = (first_column + column) * TILE_SIZE
+                y = (ground[column] + row) * TILE_SIZE
+                if rng.random() < animated:
+                    add_tile(layer, (x, y), ANIMATED_IMAGE, ANIMATION_PATH)
+                else:
+                    add_tile(layer, (x, y), rng.choice(images))
+
+    # Colliders on the cell above the ground, with walls where the neighbouring ground is higher
+    for column in range(width):
+        if rng.random() >= colliders:
+            continue
+        collider_type = ''
+        if column > 0 and ground[column - 1] < ground[column]:
+            collider_type += 'l'
+        if column < width - 1 and ground[column + 1] < ground[column]:
+            collider_type += 'r'
+        collider_type += 'd'
+
+        collider_columns['coords'].append(((first_column + column) * TILE_SIZE, (ground[column] - 1) * TILE_SIZE))
+        collider_columns['image_path'].append(COLLIDER_IMAGE.format(collider_type))
+        collider_columns['collider_type'].append(collider_type)
+
+    # Player, above the ground of the first column
+    add_tile(9, (first_column * TILE_SIZE, (ground[0] - 2) * TILE_SIZE), PLAYER_IMAGE, is_player=True)
+
+    SaveManager(None, None, True).export_columns(path, tile_columns, collider_columns)
+    return tile_columns, collider_columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', help='scene directory to write')
+    parser.add_argument('--tiles', type=int, default=100_000)
+    parser.add_argument('--layers', type=parse_layers, default=DEFAULT_LAYERS, help='layer:share pairs')
+    parser.add_argument('--animated', type=float, default=0.05, help='share of animated tiles')
+    parser.add_argument('--clouds', type=int, default=80)
+    parser.add_argument('--colliders', type=float, default=1.0, help='share of ground columns with a collider')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tile_columns, collider_columns = generate_level(
+        args.path, args.tiles, args.layers, args.animated, args.clouds, args.colliders, args.seed
+    )
+    print(f'{args.path}: {len(tile_columns["layer"])} tiles, {len(collider_columns["coords"])} colliders')
+
+
+if __name__ == '__main__':
+    main()
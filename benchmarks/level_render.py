@@ -0,0 +1,266 @@
+"""
+Headless benchmark for level rendering and physics
+
+Loads a level without a display, plays a scripted input sequence through
+Player, Camera and Level.draw at a steady frame time, and prints frames per
+second, the per-stage breakdown of the frame profiler and the peak memory.
+The cloud layer is seeded, so every run draws the same frames. The level is
+played several times and the fastest run is reported, which keeps the noise
+of a shared machine out of the numbers.
+
+The results are written to a JSON file. Given a baseline result file, every
+stage whose p50 or p95 got slower than the tolerance allows is reported as a
+regression and the exit code is 1.
+
+Usage:
+    python -m benchmarks.level_render [level directory] [--frames 1200] [--repeats 3] [--output result.json]
+                                      [--baseline baseline.json] [--tolerance 0.15] [--render-size 640 360]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+from src.backend import create_backend
+from src.profiler import get_profiler
+from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT, RENDER_WIDTH, RENDER_HEIGHT, RENDER_BACKEND, SIMULATION_TICK_RATE
+from src.timestep import FixedTimestep
+from src.utils import resource_path
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+FRAME_TIME = 1 / 60
+
+# Input script as (frames, keys held), played in a loop
+INPUT_SCRIPT: tuple = (
+    (60, ()),
+    (180, ('d',)),
+    (20, ('d', 'space')),
+    (120, ('d', 'left shift')),
+    (30, ('d', 's')),
+    (60, ()),
+    (180, ('a',)),
+    (20, ('a', 'w')),
+    (30, ('f',)),
+    (120, ('a', 'left shift')),
+)
+
+# Differences below this many milliseconds are noise, not regressions
+NOISE_FLOOR_MS: float = 0.05
+
+
+class ScriptedKeys:
+    """Keyboard state of a scripted frame, indexed by key code like pygame.key.get_pressed()"""
+
+    def __init__(self, names):
+        self.pressed = {pygame.key.key_code(name) for name in names}
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+def get_input_frames(frames):
+    """
+    Get the keys held in every frame of the input script.
+
+    Args:
+        frames (int): The number of frames to play.
+
+    Returns:
+        list: The ScriptedKeys of every frame.
+    """
+    script = [ScriptedKeys(names) for count, names in INPUT_SCRIPT for _ in range(count)]
+    return [script[index % len(script)] for index in range(frames)]
+
+
+def get_peak_memory_mb():
+    """Get the peak resident memory of this process, None where it can not be measured"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def play(level_path, frames, warmup, backend, seed):
+    """
+    Load a level and play the input script on it once.
+
+    Returns:
+        tuple: The load time in milliseconds, the frames per second and the final player rect.
+    """
+    from src.game.camera import Camera
+    from src.game.level import Level
+    from src.game.player import Player
+
+    profiler = get_profiler()
+    profiler.enabled = False
+
+    start = time.perf_counter()
+    player = Player()
+    level = Level(level_path, None, player, seed)
+    load_ms = (time.perf_counter() - start) * 1000
+    camera = Camera()
+    timestep = FixedTimestep()
+
+    for index, keys in enumerate(get_input_frames(warmup + frames)):
+        if index == warmup:
+            profiler.reset()
+            profiler.enabled = True
+            start = time.perf_counter()
+
+        # The keys of a frame are held for every tick simulated in it, like in the game
+        for _ in range(timestep.advance(FRAME_TIME)):
+            with profiler.stage('event_loop'):
+                player.event_loop(keys)
+            with profiler.stage('player'):
+                player.update(level.collision_world, timestep.tick)
+            camera.tick(player, timestep.tick)
+
+        player.interpolate(timestep.alpha)
+        with profiler.stage('camera'):
+            camera.update(FRAME_TIME, level, timestep.alpha)
+        with profiler.stage('present'):
+            backend.present()
+        profiler.end_frame()
+
+    fps = frames / (time.perf_counter() - start)
+    profiler.enabled = False
+    return load_ms, fps, list(player.rect)
+
+
+def run(level_path, frames, warmup, repeats, backend, render_size=(RENDER_WIDTH, RENDER_HEIGHT), seed=0):
+    """
+    Play the input script on a level and keep the fastest of several runs.
+
+    Args:
+        level_path (str): The level directory.
+        frames (int): The number of measured frames.
+        warmup (int): The number of frames played before measuring.
+        repeats (int): The number of runs, each on a freshly loaded level.
+        backend (str): The rendering backend.
+        render_size (tuple): The size of the canvas the level is drawn into.
+        seed (int): The seed of the cloud layer.
+
+    Returns:
+        dict: The benchmark results of the run with the highest frames per second.
+    """
+    pygame.init()
+    flags = 0 if tuple(render_size) == (WINDOW_WIDTH, WINDOW_HEIGHT) else pygame.SCALED
+    backend = create_backend(tuple(render_size), flags, backend)
+
+    results = None
+    for _ in range(repeats):
+        load_ms, fps, player_rect = play(level_path, frames, warmup, backend, seed)
+        if results is None or fps > results['fps']:
+            results = {
+                'level': level_path,
+                'frames': frames,
+                'warmup': warmup,
+                'repeats': repeats,
+                'dt': FRAME_TIME,
+                'tick_rate': SIMULATION_TICK_RATE,
+                'render_size': list(backend.target.get_size()),
+                'backend': backend.name,
+                'python': platform.python_version(),
+                'pygame': pygame.version.ver,
+                'load_ms': load_ms,
+                'fps': fps,
+                'final_player_rect': player_rect,
+                'stages': get_profiler().get_percentiles(recent=False),
+            }
+
+    results['peak_memory_mb'] = get_peak_memory_mb()
+    pygame.quit()
+    return results
+
+
+def print_results(results):
+    """Print the summary and the stage table of a result"""
+    print(f'level: {results["level"]}  backend: {results["backend"]}  '
+          f'render size: {results["render_size"][0]}x{results["render_size"][1]}')
+    print(f'load: {results["load_ms"]:.1f} ms  fps: {results["fps"]:.1f}  ', end='')
+    memory = results['peak_memory_mb']
+    print(f'peak memory: {memory:.1f} MB' if memory is not None else 'peak memory: n/a')
+    print(f'{"stage":<20}{"mean":>9}{"p50":>9}{"p95":>9}{"p99":>9}{"max":>9}  ms')
+    for name, stats in results['stages'].items():
+        print(f'{name:<20}' + ''.join(f'{stats[key]:9.3f}' for key in ('mean', 'p50', 'p95', 'p99', 'max')))
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare a result with a baseline result.
+
+    Args:
+        results (dict): The new results.
+        baseline (dict): The stored baseline results.
+        tolerance (float): The allowed slowdown as a fraction.
+
+    Returns:
+        list: A description of every regression.
+    """
+    regressions = []
+    for name, stats in results['stages'].items():
+        base = baseline['stages'].get(name)
+        if base is None:
+            continue
+        for key in ('p50', 'p95'):
+            if stats[key] > base[key] * (1 + tolerance) and stats[key] - base[key] > NOISE_FLOOR_MS:
+                regressions.append(f'{name} {key}: {base[key]:.3f} -> {stats[key]:.3f} ms '
+                                   f'(+{(stats[key] / base[key] - 1) * 100:.0f}%)')
+
+    if results['fps'] < baseline['fps'] / (1 + tolerance):
+        regressions.append(f'fps: {baseline["fps"]:.1f} -> {results["fps"]:.1f}')
+
+    if results['final_player_rect'] != baseline['final_player_rect'] and results['frames'] == baseline['frames']:
+        print(f'Warning: the player ended at {results["final_player_rect"]} instead of '
+              f'{baseline["final_player_rect"]}, the runs did not play the same game')
+    return regressions
+
+
+def main():
+    with open(resource_path('assets/data/levels.json'), 'r') as file:
+        default_level = json.load(file)['levels']['0']
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('level', nargs='?', default=default_level)
+    parser.add_argument('--frames', type=int, default=1200)
+    parser.add_argument('--warmup', type=int, default=60)
+    parser.add_argument('--repeats', type=int, default=3, help='runs to play, the fastest one is reported')
+    parser.add_argument('--backend', default=RENDER_BACKEND, choices=('software', 'texture'))
+    parser.add_argument('--render-size', type=int, nargs=2, default=[RENDER_WIDTH, RENDER_HEIGHT],
+                        metavar=('WIDTH', 'HEIGHT'), help='size of the canvas the level is drawn into')
+    parser.add_argument('--output', default='level_render.json', help='file the results are written to')
+    parser.add_argument('--baseline', help='results of an earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed slowdown, 0.15 is 15%%')
+    args = parser.parse_args()
+
+    results = run(args.level, args.frames, args.warmup, args.repeats, args.backend, args.render_size)
+    print_results(results)
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+    print(f'results written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print('regressions:')
+            for regression in regressions:
+                print(f'  {regression}')
+            sys.exit(1)
+        print(f'no regressions against {args.baseline}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Texture memory report for a level
+
+Loads a level the way the game and the editor do and adds up the pixel
+memory of the surfaces its tiles draw. Tiles share the decoded images, so
+every pixel buffer is counted once; the report compares that with the
+private per-tile copies tiles used to make. It also lists the memory of the
+baked parallax strips.
+
+Usage:
+    python -m benchmarks.memory_report [level directory]
+"""
+import argparse
+import json
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+from src.save_manager import SaveManager
+from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT
+from src.utils import resource_path
+
+MEGABYTE = 1024 * 1024
+
+
+def surface_bytes(surface):
+    """Get the size of the pixels of a surface"""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def get_objects(data):
+    """Get every tile and collider object of imported scene data"""
+    canvas_data, _, collider_data = data
+    objects = [obj for layer in canvas_data.values() for obj in layer.values()]
+    return objects + list(collider_data.values())
+
+
+def measure(objects):
+    """
+    Measure the texture memory of scene objects.
+
+    Returns:
+        tuple: The bytes of the distinct pixel buffers and of one private copy per object.
+    """
+    buffers = {}
+    copies = 0
+
+    for obj in objects:
+        static_image = getattr(obj, 'static_image', None)
+        images = [static_image] + list(getattr(obj, 'animation', None) or ())
+        for image in images:
+            if image is None:
+                continue
+            # Atlas regions share the pixels of their sheet
+            root = image.get_abs_parent()
+            buffers[id(root)] = surface_bytes(root)
+
+        # Tiles drawn from an atlas region never had a copy of their own
+        if static_image is not None and getattr(obj, 'region', None) is None:
+            copies += surface_bytes(static_image)
+
+    return sum(buffers.values()), copies
+
+
+def report(name, objects):
+    """Print the memory of shared images next to the old per-object copies"""
+    shared, copies = measure(objects)
+    print(f'{name}: {len(objects)} objects')
+    print(f'  shared images:           {shared / MEGABYTE:8.2f} MB')
+    print(f'  with per-object copies:  {(shared + copies) / MEGABYTE:8.2f} MB')
+    print(f'  saved:                   {copies / MEGABYTE:8.2f} MB')
+
+
+def report_parallax(level):
+    """Print the memory of the baked parallax strips of a level"""
+    layers = {**level.background_layers, **level.foreground_layers}
+    print(f'parallax strips: {len(layers)} layers')
+    for layer, data in layers.items():
+        strip = data['strip']
+        size = strip.surface.get_size() if strip.surface else (0, 0)
+        print(f'  layer {layer:>2}: {len(strip.tiles)} tiles, strip {size[0]}x{size[1]}, '
+              f'{strip.nbytes / MEGABYTE:8.2f} MB baked')
+    print(f'  total baked:             {sum(data["strip"].nbytes for data in layers.values()) / MEGABYTE:8.2f} MB')
+
+
+def main():
+    with open(resource_path('assets/data/levels.json'), 'r') as file:
+        default_level = json.load(file)['levels']['0']
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('level', nargs='?', default=default_level)
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    from src.game.level import TileObject, Collider
+    game_data = SaveManager(TileObject, Collider, False).import_scene(args.level, '')
+    report('game', get_objects(game_data))
+
+    from src.game.level import Level
+    from src.game.player import Player
+    report_parallax(Level(args.level, None, Player()))
+
+    from src.editor.editor import CanvasObject
+    editor_data = SaveManager(CanvasObject, None, True).import_scene(args.level, '')
+    report('editor', get_objects(editor_data))
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark for level change transitions
+
+Plays whole transitions at 60 frames per second of game time and prints the
+frame time of drawing the cover: the old per-frame pygame.draw.circle iris
+and every transition shape.
+
+Usage:
+    python -m benchmarks.transition [--runs 5]
+"""
+import argparse
+import math
+import os
+import statistics
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT
+from src.transition import Transition, TRANSITION_SHAPES
+
+FRAME_TIME = 1 / 60
+
+
+class LegacyIris:
+    """The iris as it used to be drawn, one bordered circle per frame"""
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.center = (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)
+        self.radius = math.hypot(*self.center)
+        self.threshold = self.radius + 100
+        self.border_width = 0
+
+    def frames(self):
+        """Draw the transition frame by frame"""
+        direction = 1
+        self.border_width = 0
+        while self.border_width >= 0:
+            self.border_width += 1000 * FRAME_TIME * direction
+            if self.border_width >= self.threshold:
+                direction = -1
+            pygame.draw.circle(self.surface, 'black', self.center, self.radius, int(self.border_width))
+            yield
+
+
+def transition_frames(transition):
+    """Play a Transition frame by frame"""
+    transition.active = True
+    while transition.active:
+        transition.display(FRAME_TIME)
+        yield
+
+
+def time_frames(frames, surface):
+    """
+    Time every frame of a transition.
+
+    Returns:
+        list: The frame times in milliseconds.
+    """
+    times = []
+    while True:
+        surface.fill('white')
+        start = time.perf_counter()
+        try:
+            next(frames)
+        except StopIteration:
+            return times
+        times.append((time.perf_counter() - start) * 1000)
+
+
+def describe(times):
+    """Format the mean, 95th percentile and worst frame time"""
+    times = sorted(times)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    return f'{statistics.mean(times):6.3f} mean {p95:6.3f} p95 {times[-1]:6.3f} max ms ({len(times)} frames)'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='transitions played per measurement')
+    args = parser.parse_args()
+
+    pygame.init()
+    surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    legacy = LegacyIris(surface)
+    times = [t for _ in range(args.runs) for t in time_frames(legacy.frames(), surface)]
+    print(f'{"legacy iris":>16}: {describe(times)}')
+
+    for name in TRANSITION_SHAPES:
+        transition = Transition(lambda: None, name)
+        times = [t for _ in range(args.runs) for t in time_frames(transition_frames(transition), surface)]
+        print(f'{name:>16}: {describe(times)}')
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,15 @@ import json
 import pygame
 import pygame.locals as pl
 from pygame.image import load
-from pygame.math import Vector2 as vector
 from typing import Dict, Optional
 
 from src.utils import resource_path
-from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT, EDITOR_MODE
+from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT, RENDER_WIDTH, RENDER_HEIGHT, EDITOR_MODE, FRAME_RATE_LIMIT, RENDER_BACKEND
+from src.backend import create_backend
+from src.dirty_rects import get_dirty_rects
+from src.profiler import get_profiler
+from src.timestep import FixedTimestep
+from src.transition import Transition
 
 if EDITOR_MODE:
     from src.editor.editor import Editor
@@ -28,11 +32,17 @@ class Main:
     def _init_pygame(self) -> None:
         """Initialize Pygame and create window"""
         pygame.init()
-        self.display_surface = pygame.display.set_mode(
-            (WINDOW_WIDTH, WINDOW_HEIGHT), 
-            pl.HWSURFACE | pl.DOUBLEBUF
-        )
+        if EDITOR_MODE:
+            # The editor draws everything with pygame.draw and fonts, which the texture backend would upload every frame
+            self.backend = create_backend((WINDOW_WIDTH, WINDOW_HEIGHT), pl.HWSURFACE | pl.DOUBLEBUF, 'software')
+        elif (RENDER_WIDTH, RENDER_HEIGHT) == (WINDOW_WIDTH, WINDOW_HEIGHT):
+            self.backend = create_backend((WINDOW_WIDTH, WINDOW_HEIGHT), pl.HWSURFACE | pl.DOUBLEBUF, RENDER_BACKEND)
+        else:
+            # The game draws into a smaller canvas and SDL scales it up to the window on the GPU
+            self.backend = create_backend((RENDER_WIDTH, RENDER_HEIGHT), pl.SCALED | pl.DOUBLEBUF, RENDER_BACKEND)
         self.clock = pygame.time.Clock()
+        self.timestep = FixedTimestep()
+        self.profiler = get_profiler()
 
     def _init_game_components(self) -> None:
         """Initialize game-specific components"""
@@ -99,19 +109,47 @@ class Main:
             print(f"Error changing level: {e}")
             self.level = None
 
+        # Loading is not game time, the simulation continues from here
+        self.clock.tick()
+        self.timestep.reset()
+
     def _run_editor(self, dt: float) -> None:
         """Run editor mode update loop"""
-        self.editor.run(dt)
-        pygame.display.update()
+        with self.profiler.stage('editor'):
+            self.editor.run(dt)
+        self._present()
 
     def _run_game(self, dt: float) -> None:
-        """Run game mode update loop"""
+        """Run game mode update loop, simulating fixed ticks and drawing between the last two"""
         if self.level is not None:
-            self.transition.display(dt)
+            for _ in range(self.timestep.advance(dt)):
+                self._tick_game(self.timestep.tick)
+                if self.level is None:
+                    return
+
+            alpha = self.timestep.alpha
+            self.player.interpolate(alpha)
+            with self.profiler.stage('camera'):
+                self.camera.update(dt, self.level, alpha)
+            # Over the level, which would otherwise cover the transition
+            with self.profiler.stage('transition'):
+                self.transition.display(dt)
+            self._present()
+
+    def _tick_game(self, tick: float) -> None:
+        """Advance the game simulation by one fixed tick"""
+        with self.profiler.stage('event_loop'):
             self.player.event_loop()
-            self.player.update(self.level.collider_data.values(), dt)
-            self.camera.update(dt, self.level, self.player)
-            pygame.display.update()
+        with self.profiler.stage('player'):
+            self.player.update(self.level.collision_world, tick)
+        self.camera.tick(self.player, tick)
+
+    def _present(self) -> None:
+        """Draw the profiler overlay and show the frame"""
+        self.profiler.draw_overlay(self.backend.get_canvas(), get_dirty_rects())
+        with self.profiler.stage('present'):
+            self.backend.present()
+        self.profiler.end_frame()
 
     def run(self) -> None:
         """Main game loop"""
@@ -131,64 +169,10 @@ class Main:
     def _run_game_loop(self) -> None:
         """Game mode main loop"""
         while True:
-            dt = self.clock.tick(60) * 0.001
+            dt = self.clock.tick(FRAME_RATE_LIMIT) * 0.001
             self._run_game(dt)
 
 
-class Transition:
-    """Handles level transition effects"""
-    
-    def __init__(self, toggle_callback):
-        """Initialize transition effect"""
-        self.display_surface = pygame.display.get_surface()
-        self.toggle = toggle_callback
-        self.active = False
-        self._init_transition_parameters()
-
-    def _init_transition_parameters(self) -> None:
-        """Initialize transition effect parameters"""
-        self.border_width = 0
-        self.direction = 1
-        self.center = (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)
-        self.radius = vector(self.center).magnitude()
-        self.threshold = self.radius + 100
-
-    def display(self, dt: float) -> None:
-        """Update and display transition effect"""
-        if not self.active:
-            return
-
-        self._update_transition(dt)
-        self._draw_transition()
-
-    def _update_transition(self, dt: float) -> None:
-        """Update transition effect state"""
-        self.border_width += 1000 * dt * self.direction
-        
-        if self.border_width >= self.threshold:
-            self.direction = -1
-            self.toggle()
-
-        if self.border_width < 0:
-            self._reset_transition()
-
-    def _reset_transition(self) -> None:
-        """Reset transition effect to initial state"""
-        self.active = False
-        self.border_width = 0
-        self.direction = 1
-
-    def _draw_transition(self) -> None:
-        """Draw transition effect"""
-        pygame.draw.circle(
-            self.display_surface,
-            'black',
-            self.center,
-            self.radius,
-            int(self.border_width)
-        )
-
-
 if __name__ == '__main__':
     main = Main()
     main.run()
@@ -0,0 +1,84 @@
+"""
+Shared animation clock
+
+Every tile that uses the same animation frames shows the same frame, so the
+frames are wrapped in one AnimationClip per animation. The level or editor
+advances all clips once per frame and tiles read the current frame from
+their clip instead of keeping and updating a frame of their own.
+"""
+from weakref import WeakValueDictionary
+
+
+class AnimationClip:
+    """The frames of an animation and the frame currently shown"""
+
+    def __init__(self, frames):
+        """
+        Initialize the clip on its first frame.
+
+        Args:
+            frames (tuple): The animation frames.
+        """
+        self.frames = frames
+        self.frame = frames[0]
+
+    def update(self, index):
+        """
+        Show the frame of a global animation index.
+
+        Args:
+            index (int): The animation index, wrapped to the length of the clip.
+        """
+        self.frame = self.frames[index % len(self.frames)]
+
+
+class AnimationRegistry:
+    """The clips of all animations in use, held only as long as a tile uses them"""
+
+    def __init__(self):
+        self.clips = WeakValueDictionary()  # frames tuple -> AnimationClip
+
+    def get(self, frames):
+        """
+        Get the shared clip of an animation.
+
+        Args:
+            frames (sequence): The animation frames.
+
+        Returns:
+            AnimationClip: The clip, None if there are no frames.
+        """
+        if not frames:
+            return None
+
+        frames = tuple(frames)
+        clip = self.clips.get(frames)
+        if clip is None:
+            clip = self.clips[frames] = AnimationClip(frames)
+        return clip
+
+    def update(self, index):
+        """
+        Advance every clip to the frame of a global animation index.
+
+        Args:
+            index (int): The animation index of the current frame.
+        """
+        for clip in list(self.clips.values()):
+            clip.update(index)
+
+
+_animation_registry = None
+
+
+def get_animation_registry():
+    """
+    Get the animation registry of this process, creating it on first use.
+
+    Returns:
+        AnimationRegistry: The shared registry.
+    """
+    global _animation_registry
+    if _animation_registry is None:
+        _animation_registry = AnimationRegistry()
+    return _animation_registry
@@ -0,0 +1,190 @@
+"""
+Index of the editor asset directories
+
+Maps every image listed in the editor menus to its (index, inner_index) in
+EDITOR_DATA and keeps the file listing of each directory. The index is built
+once per process and persisted to disk; a directory is scanned again only
+when its modification time changes.
+"""
+import json
+import os
+
+from src.editor.settings import EDITOR_DATA, ASSET_INDEX_PATH
+
+INDEX_VERSION: int = 1
+
+# Project root, asset paths are stored relative to it
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class AssetIndex:
+    """Lookup table from image paths to editor menu positions"""
+
+    def __init__(self, cache_path=None):
+        """
+        Initialize the index from the cache file, rescanning changed directories.
+
+        Args:
+            cache_path (str): The path to the cache file, ASSET_INDEX_PATH if None.
+        """
+        self.cache_path = cache_path or os.path.join(ROOT_PATH, ASSET_INDEX_PATH)
+        self.directories = {}  # normalized directory -> {'mtime': float, 'files': [str]}
+        self.paths = {}  # normalized image path -> (index, inner_index)
+
+        changed = self._load_directories()
+        self._build_paths()
+
+        if changed:
+            self._save()
+
+    @staticmethod
+    def normalize(path):
+        """
+        Normalize a path so that Windows and POSIX spellings share one key.
+
+        Args:
+            path (str): An absolute path or a path relative to the project root.
+
+        Returns:
+            str: The normalized path relative to the project root.
+        """
+        path = str(path).replace('\\', '/')
+        if os.path.isabs(path):
+            path = os.path.relpath(path, ROOT_PATH)
+        return os.path.normcase(os.path.normpath(path))
+
+    @staticmethod
+    def _scan_directory(directory):
+        """
+        List the files of a directory in os.listdir order.
+
+        Args:
+            directory (str): The normalized directory path.
+
+        Returns:
+            list: The file names.
+        """
+        directory_path = os.path.join(ROOT_PATH, directory)
+        return [
+            item
+            for item in os.listdir(directory_path)
+            if os.path.isfile(os.path.join(directory_path, item))
+        ]
+
+    def _read_cache(self):
+        """
+        Read the persisted directory listings.
+
+        Returns:
+            dict: The cached directories, empty if the cache is missing or outdated.
+        """
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+        if data.get('version') != INDEX_VERSION:
+            return {}
+        return data.get('directories', {})
+
+    def _load_directories(self):
+        """
+        Fill the directory listings from the cache and rescan the changed ones.
+
+        Returns:
+            bool: True if any directory had to be scanned.
+        """
+        cached = self._read_cache()
+        changed = False
+
+        for data in EDITOR_DATA.values():
+            for directory in (data['menu_surf'], data['graphics']):
+                if not directory:
+                    continue
+
+                directory = self.normalize(directory)
+                if directory in self.directories:
+                    continue
+
+                mtime = os.path.getmtime(os.path.join(ROOT_PATH, directory))
+                entry = cached.get(directory)
+                if entry is None or entry.get('mtime') != mtime:
+                    entry = {'mtime': mtime, 'files': self._scan_directory(directory)}
+                    changed = True
+
+                self.directories[directory] = entry
+
+        return changed
+
+    def _build_paths(self):
+        """Map every menu image to the first EDITOR_DATA entry that lists it, preferring entries without animation"""
+        # Static and animated entries can share a menu directory, e.g. still and animated water. A saved
+        # tile keeps its own animation path, so the static entry is the one that does not add an animation
+        entries = sorted(EDITOR_DATA.items(), key=lambda item: bool(item[1]['graphics']))
+        for index, data in entries:
+            if not data['menu_surf']:
+                continue
+
+            directory = self.normalize(data['menu_surf'])
+            for inner_index, name in enumerate(self.directories[directory]['files']):
+                self.paths.setdefault(os.path.join(directory, os.path.normcase(name)), (index, inner_index))
+
+    def _save(self):
+        """Persist the directory listings, a read-only install just keeps them in memory"""
+        data = {'version': INDEX_VERSION, 'directories': self.directories}
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False)
+        except OSError as e:
+            print(f"Warning: Could not save asset index: {e}")
+
+    def find(self, image_path):
+        """
+        Find the index and inner index of an image path.
+
+        Args:
+            image_path (str): The path to the image.
+
+        Returns:
+            tuple: The index and inner index of the image, (None, None) if it is not in a menu.
+        """
+        if not isinstance(image_path, str):
+            return None, None
+        return self.paths.get(self.normalize(image_path), (None, None))
+
+    def files_in(self, directory_path):
+        """
+        Get a list of files in the specified directory.
+
+        Args:
+            directory_path (str): The path to the directory relative to the project root.
+
+        Returns:
+            list: A list of absolute file paths.
+        """
+        directory = self.normalize(directory_path)
+        entry = self.directories.get(directory)
+        if entry is None:
+            entry = {'files': self._scan_directory(directory)}
+            self.directories[directory] = entry
+
+        directory_path = os.path.join(ROOT_PATH, directory_path)
+        return [os.path.join(directory_path, name) for name in entry['files']]
+
+
+_asset_index = None
+
+
+def get_asset_index():
+    """
+    Get the asset index of this process, building it on first use.
+
+    Returns:
+        AssetIndex: The shared asset index.
+    """
+    global _asset_index
+    if _asset_index is None:
+        _asset_index = AssetIndex()
+    return _asset_index
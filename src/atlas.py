@@ -0,0 +1,276 @@
+"""
+Texture atlases for tile graphics
+
+The images a level uses from every tile category (land, dirt, water, ...)
+are packed into a few large sheets with a lookup table from image path to
+sheet region. Tiles draw a subsurface of a sheet, so the level holds a
+handful of surfaces instead of one per tile image, and no pixels of images
+it does not use. Baked sheets are cached as PNG files per set of images and
+rebuilt when a source image changes.
+"""
+import hashlib
+import json
+import os
+
+import pygame
+
+from src.asset_index import AssetIndex, ROOT_PATH, get_asset_index
+from src.editor.settings import TILES_PATH, ATLAS_CACHE_PATH
+from src.image_loader import ImageLoader
+from src.settings import ATLAS_SHEET_SIZE
+
+ATLAS_VERSION: int = 2
+
+# Difference between the shelf widths tried when packing a sheet
+SHELF_WIDTH_STEP: int = 64
+
+
+class AtlasRegion:
+    """A region of an atlas sheet"""
+
+    def __init__(self, sheet, rect):
+        """
+        Initialize the region.
+
+        Args:
+            sheet (pygame.Surface): The atlas sheet.
+            rect (pygame.Rect): The area of the image on the sheet.
+        """
+        self.sheet = sheet
+        self.rect = rect
+        # Shares the sheet's pixels, draws like a standalone image
+        self.surface = sheet.subsurface(rect)
+
+
+class TextureAtlas:
+    """The atlas sheets of images from one tile category"""
+
+    def __init__(self, directory, names, sheet_size=ATLAS_SHEET_SIZE):
+        """
+        Load the atlas of a category from the cache, baking it if needed.
+
+        Args:
+            directory (str): The category directory relative to the project root.
+            names (iterable): The file names of the images to pack.
+            sheet_size (int): The width and height of a sheet.
+        """
+        self.directory = AssetIndex.normalize(directory)
+        self.sheet_size = sheet_size
+        self.cache_dir = os.path.join(ROOT_PATH, ATLAS_CACHE_PATH)
+        self.sheets = []
+        self.table = {}  # file name -> [sheet index, x, y, width, height]
+        self.regions = {}  # normalized image path -> AtlasRegion
+
+        names = {os.path.normcase(name) for name in names}
+        files = [
+            path for path in get_asset_index().files_in(self.directory)
+            if os.path.normcase(os.path.basename(path)) in names
+        ]
+        self.name = self._get_name(files)
+        sources = self._get_sources(files)
+
+        if not self._load_cache(sources):
+            self._bake(files)
+            self._save_cache(sources)
+
+    def _get_name(self, files):
+        """Get the cache name of the atlas, the category and a hash of the packed files"""
+        name = os.path.basename(self.directory)
+        digest = hashlib.sha1('\n'.join(sorted(os.path.basename(path) for path in files)).encode('utf-8'))
+        return f'{name}_{digest.hexdigest()[:12]}'
+
+    @staticmethod
+    def _get_sources(files):
+        """Get the modification time and size of every source image"""
+        sources = {}
+        for path in files:
+            stat = os.stat(path)
+            sources[os.path.basename(path)] = [stat.st_mtime, stat.st_size]
+        return sources
+
+    def _table_path(self):
+        """Get the path to the cached lookup table"""
+        return os.path.join(self.cache_dir, f'{self.name}.json')
+
+    def _sheet_path(self, index):
+        """Get the path to a cached sheet"""
+        return os.path.join(self.cache_dir, f'{self.name}_{index}.png')
+
+    def _region_key(self, name):
+        """Get the lookup key of an image in this category"""
+        return AssetIndex.normalize(os.path.join(self.directory, name))
+
+    def _pack(self, images):
+        """
+        Place images on sheets with shelf packing, tallest first.
+
+        Shelves are tried at several widths up to the sheet size and the
+        width that leaves the least empty area on the cropped sheets is used.
+
+        Args:
+            images (dict): The surfaces by file name.
+
+        Returns:
+            dict: The (sheet index, pygame.Rect) of every image that fits on a sheet.
+        """
+        fitting = {
+            name: image for name, image in images.items()
+            if image.get_width() <= self.sheet_size and image.get_height() <= self.sheet_size
+        }
+        if not fitting:
+            return {}
+
+        narrowest = max(image.get_width() for image in fitting.values())
+        best, best_area = None, None
+        for width in range(narrowest, self.sheet_size + 1, SHELF_WIDTH_STEP):
+            placements = self._pack_shelves(fitting, width)
+            area = sum(width * height for width, height in self.get_sheet_sizes(placements).values())
+            if best is None or area < best_area:
+                best, best_area = placements, area
+        return best
+
+    def _pack_shelves(self, images, shelf_width):
+        """Place images that fit a sheet on shelves of a width, tallest first"""
+        placements = {}
+        sheet, x, y, shelf_height = 0, 0, 0, 0
+
+        for name, image in sorted(images.items(), key=lambda item: -item[1].get_height()):
+            width, height = image.get_size()
+            if x + width > shelf_width:
+                x, y, shelf_height = 0, y + shelf_height, 0
+            if y + height > self.sheet_size:
+                sheet, x, y, shelf_height = sheet + 1, 0, 0, 0
+
+            placements[name] = (sheet, pygame.Rect(x, y, width, height))
+            x += width
+            shelf_height = max(shelf_height, height)
+
+        return placements
+
+    @staticmethod
+    def get_sheet_sizes(placements):
+        """
+        Get the size of every sheet cropped to the area its images use.
+
+        Args:
+            placements (dict): The (sheet index, pygame.Rect) of every image.
+
+        Returns:
+            dict: The (width, height) by sheet index.
+        """
+        sheet_sizes = {}
+        for sheet, rect in placements.values():
+            width, height = sheet_sizes.get(sheet, (0, 0))
+            sheet_sizes[sheet] = (max(width, rect.right), max(height, rect.bottom))
+        return sheet_sizes
+
+    def _bake(self, files):
+        """Decode the category images and draw them onto new sheets"""
+        decoded = ImageLoader().decode_all(files)
+        images = {os.path.basename(path): image for path, image in decoded.items() if image is not None}
+        placements = self._pack(images)
+
+        # Crop every sheet to the area its images use
+        sheet_sizes = self.get_sheet_sizes(placements)
+
+        self.sheets = [
+            pygame.Surface(sheet_sizes[sheet], pygame.SRCALPHA).convert_alpha()
+            for sheet in sorted(sheet_sizes)
+        ]
+        for sheet in self.sheets:
+            sheet.fill((0, 0, 0, 0))
+
+        for name, (sheet, rect) in placements.items():
+            self.sheets[sheet].blit(images[name], rect)
+            self.table[name] = [sheet, *rect]
+
+        self._create_regions()
+
+    def _create_regions(self):
+        """Create the regions of the lookup table on the current sheets"""
+        for name, (sheet, x, y, width, height) in self.table.items():
+            self.regions[self._region_key(name)] = AtlasRegion(self.sheets[sheet], pygame.Rect(x, y, width, height))
+
+    def _load_cache(self, sources):
+        """
+        Load baked sheets if they were built from the current source images.
+
+        Returns:
+            bool: True if the cache was valid and loaded.
+        """
+        try:
+            with open(self._table_path(), 'r', encoding='utf-8') as file:
+                data = json.load(file)
+
+            if (data['version'] != ATLAS_VERSION or data['sheet_size'] != self.sheet_size
+                    or data['sources'] != sources):
+                return False
+
+            paths = [self._sheet_path(i) for i in range(data['sheets'])]
+            decoded = ImageLoader().decode_all(paths)
+        except (OSError, ValueError, KeyError):
+            return False
+
+        if any(decoded[path] is None for path in paths):
+            return False
+
+        self.sheets = [decoded[path].convert_alpha() for path in paths]
+        self.table = data['regions']
+        self._create_regions()
+        return True
+
+    def _save_cache(self, sources):
+        """Save the sheets and lookup table, a read-only install just keeps them in memory"""
+        data = {
+            'version': ATLAS_VERSION,
+            'sheet_size': self.sheet_size,
+            'sources': sources,
+            'sheets': len(self.sheets),
+            'regions': self.table,
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for i, sheet in enumerate(self.sheets):
+                pygame.image.save(sheet, self._sheet_path(i))
+            with open(self._table_path(), 'w', encoding='utf-8') as file:
+                json.dump(data, file)
+        except (OSError, pygame.error) as e:
+            print(f"Warning: Could not save atlas '{self.name}': {e}")
+
+
+class AtlasLibrary:
+    """Packs the tile category images a level uses into atlases"""
+
+    def __init__(self):
+        self.tiles_path = AssetIndex.normalize(TILES_PATH)
+        self.atlases = {}  # normalized category directory -> TextureAtlas
+
+    def find_regions(self, image_paths):
+        """
+        Find the atlas regions of images, packing the images of every category into one atlas.
+
+        Args:
+            image_paths (iterable): The paths to the images, may contain duplicates and other values.
+
+        Returns:
+            dict: The regions by image path, images outside the tile categories are left out.
+        """
+        # normalized category directory -> {image path: normalized image path}
+        categories = {}
+        for path in dict.fromkeys(image_paths):
+            if not isinstance(path, str):
+                continue
+
+            key = AssetIndex.normalize(path)
+            directory = os.path.dirname(key)
+            if os.path.dirname(directory) == self.tiles_path:
+                categories.setdefault(directory, {})[path] = key
+
+        regions = {}
+        for directory, keys in categories.items():
+            atlas = self.atlases[directory] = TextureAtlas(directory, [os.path.basename(key) for key in keys.values()])
+            for path, key in keys.items():
+                region = atlas.regions.get(key)
+                if region is not None:
+                    regions[path] = region
+        return regions
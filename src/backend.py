@@ -0,0 +1,271 @@
+"""
+Rendering backends
+
+Drawing code draws onto the target of the active backend, which offers the
+blit, blits and fill calls of a pygame.Surface. The software backend's target
+is the display surface itself. The texture backend uploads every image once
+as a pygame._sdl2 Texture and draws it through the SDL Renderer of the
+window, which also works with SDL's software renderer.
+
+Code that draws with pygame.draw or fonts uses the canvas of the backend
+instead, a software surface that the texture backend puts on top of
+everything else. Only the areas the dirty rectangle tracker reports are
+uploaded, so drawing code reports what it draws on the canvas.
+"""
+import weakref
+
+import numpy as np
+import pygame
+
+from src.dirty_rects import get_dirty_rects
+from src.settings import RENDER_BACKEND
+
+try:
+    from pygame._sdl2 import video
+except ImportError:
+    video = None
+
+
+def unpremultiply(surface):
+    """
+    Get a copy of a premultiplied alpha surface with straight alpha.
+
+    SDL renderers can not blend premultiplied textures everywhere, so baked
+    surfaces are converted back before they are uploaded.
+
+    Args:
+        surface (pygame.Surface): The premultiplied surface.
+
+    Returns:
+        pygame.Surface: The surface with straight alpha.
+    """
+    surface = surface.copy()
+    rgb = pygame.surfarray.pixels3d(surface)
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    covered = alpha > 0
+    rgb[covered] = np.minimum(rgb[covered].astype(np.uint16) * 255 // alpha[covered][:, None], 255)
+    del rgb, alpha  # Unlock the surface
+    return surface
+
+
+class SoftwareBackend:
+    """Draws with Surface.blit onto the display surface"""
+
+    name = 'software'
+
+    def __init__(self, surface):
+        """
+        Initialize the backend.
+
+        Args:
+            surface (pygame.Surface): The display surface.
+        """
+        self.target = surface
+        self.canvas = surface
+
+    def get_canvas(self):
+        """Get the surface for pygame.draw and font drawing, the display surface itself"""
+        return self.canvas
+
+    def present(self):
+        """Show the frame, pushing only the changed areas"""
+        get_dirty_rects().update_display()
+
+
+class TextureTarget:
+    """Draws surfaces through an SDL renderer, uploading each pixel buffer once"""
+
+    def __init__(self, renderer, size):
+        """
+        Initialize the target.
+
+        Args:
+            renderer (pygame._sdl2.video.Renderer): The renderer of the window.
+            size (tuple): The logical size of the window.
+        """
+        self.renderer = renderer
+        self.rect = pygame.Rect((0, 0), size)
+        self.textures = weakref.WeakKeyDictionary()  # pygame.Surface -> Texture
+
+    def get_size(self):
+        """Get the logical size of the window"""
+        return self.rect.size
+
+    def get_width(self):
+        """Get the logical width of the window"""
+        return self.rect.width
+
+    def get_height(self):
+        """Get the logical height of the window"""
+        return self.rect.height
+
+    def get_rect(self, **kwargs):
+        """Get the area of the window like Surface.get_rect"""
+        rect = self.rect.copy()
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def get_texture(self, surface, premultiplied=False):
+        """
+        Get the texture holding the pixels of a surface.
+
+        Atlas regions are drawn from the texture of their whole sheet.
+
+        Args:
+            surface (pygame.Surface): The surface to draw.
+            premultiplied (bool): Whether the surface has premultiplied alpha.
+
+        Returns:
+            tuple: The texture and the position of the surface in it.
+        """
+        root = surface.get_abs_parent()
+        texture = self.textures.get(root)
+        if texture is None:
+            texture = video.Texture.from_surface(self.renderer, unpremultiply(root) if premultiplied else root)
+            self.textures[root] = texture
+        return texture, surface.get_abs_offset()
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """
+        Draw a surface like Surface.blit.
+
+        Returns:
+            pygame.Rect: The area drawn on screen.
+        """
+        texture, offset = self.get_texture(source, special_flags == pygame.BLEND_PREMULTIPLIED)
+        src_rect = source.get_rect()
+        if area is not None:
+            src_rect = src_rect.clip(area)
+
+        dest_rect = pygame.Rect(int(dest[0]), int(dest[1]), src_rect.width, src_rect.height)
+        texture.draw(src_rect.move(offset), dest_rect)
+        return dest_rect.clip(self.rect)
+
+    def blits(self, blit_sequence, doreturn=True):
+        """Draw a sequence of (source, dest[, area[, special_flags]]) like Surface.blits"""
+        rects = [self.blit(*item) for item in blit_sequence]
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None, special_flags=0):
+        """
+        Fill an area with a solid color like Surface.fill.
+
+        Returns:
+            pygame.Rect: The filled area.
+        """
+        self.renderer.draw_color = pygame.Color(color)
+        rect = self.rect.clip(rect) if rect is not None else self.rect.copy()
+        self.renderer.fill_rect(rect)
+        return rect
+
+
+class TextureBackend:
+    """Draws textures through the SDL renderer of the window"""
+
+    name = 'texture'
+
+    def __init__(self, size):
+        """
+        Take over the renderer of a window opened with pygame.SCALED.
+
+        Args:
+            size (tuple): The logical size of the window.
+        """
+        self.renderer = video.Renderer.from_window(video.Window.from_display_module())
+        self.target = TextureTarget(self.renderer, size)
+
+        self.canvas = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        self.canvas.fill((0, 0, 0, 0))
+        self.canvas_texture = video.Texture(self.renderer, size, streaming=True)
+        self.canvas_texture.blend_mode = 1  # SDL_BLENDMODE_BLEND
+        self.canvas_used = False
+        self.canvas_was_used = False  # The texture still holds what the last frame drew
+
+    def get_canvas(self):
+        """
+        Get the software surface for pygame.draw and font drawing.
+
+        It is shown on top of the frame, but only in frames that asked for it.
+        """
+        self.canvas_used = True
+        return self.canvas
+
+    def present(self):
+        """Show the frame, uploading the changed areas of the canvas"""
+        dirty_rects = get_dirty_rects()
+        if self.canvas_used or self.canvas_was_used:
+            self._upload_canvas(dirty_rects.get_changed())
+        if self.canvas_used:
+            self.canvas_texture.draw(dstrect=self.target.rect)
+
+        self.canvas_was_used = self.canvas_used
+        self.canvas_used = False
+        dirty_rects.next_frame()
+        self.renderer.present()
+
+    def _upload_canvas(self, changed):
+        """
+        Copy changed areas of the canvas into its texture and clear them for the next frame.
+
+        Args:
+            changed (list): The areas drawn this or the last frame, None for the whole canvas.
+        """
+        if changed is None:
+            self.canvas_texture.update(self.canvas)
+            self.canvas.fill((0, 0, 0, 0))
+            return
+
+        # Texture.update reads from the top left of the surface it is given, areas can overlap so all are
+        # uploaded before any is cleared
+        for rect in changed:
+            self.canvas_texture.update(self.canvas.subsurface(rect), rect)
+        for rect in changed:
+            self.canvas.fill((0, 0, 0, 0), rect)
+
+
+_backend = None
+
+
+def create_backend(size, flags=0, name=RENDER_BACKEND):
+    """
+    Open the window and create the rendering backend.
+
+    The texture backend falls back to the software backend when
+    pygame._sdl2 is not available.
+
+    Args:
+        size (tuple): The render size of the window.
+        flags (int): The display flags of the window.
+        name (str): The backend, 'software' or 'texture'.
+
+    Returns:
+        SoftwareBackend | TextureBackend: The backend, also returned by get_backend from now on.
+    """
+    global _backend
+    if name == 'texture' and video is None:
+        print("Warning: pygame._sdl2 is not available, drawing with the software backend")
+        name = 'software'
+
+    if name == 'texture':
+        # pygame.SCALED windows draw through an SDL renderer the backend can take over
+        pygame.display.set_mode(size, flags | pygame.SCALED)
+        _backend = TextureBackend(size)
+    else:
+        _backend = SoftwareBackend(pygame.display.set_mode(size, flags))
+    return _backend
+
+
+def get_backend():
+    """
+    Get the rendering backend of this process.
+
+    Without create_backend, the software backend draws onto the current display surface.
+
+    Returns:
+        SoftwareBackend | TextureBackend: The shared backend.
+    """
+    global _backend
+    if _backend is None:
+        _backend = SoftwareBackend(pygame.display.get_surface())
+    return _backend
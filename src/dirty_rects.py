@@ -0,0 +1,86 @@
+"""
+Dirty rectangle tracking for display updates
+
+Everything that draws reports the screen areas it changed, and the main loop
+pushes only those areas to the window instead of the whole frame. An area
+drawn in the previous frame is pushed once more, so a sprite that moved away
+is also erased on screen. Anything that changes the whole picture, like a
+scrolling camera, requests a full update instead.
+"""
+import pygame
+
+from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT
+
+
+class DirtyRects:
+    """Collects the changed screen areas of a frame"""
+
+    def __init__(self, size=(WINDOW_WIDTH, WINDOW_HEIGHT)):
+        """
+        Initialize the tracker, the first frame is always pushed in full.
+
+        Args:
+            size (tuple): The size of the display surface.
+        """
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.rects = []
+        self.is_full = True
+        self.previous = None  # Areas of the last frame, None if it was a full update
+
+    def add(self, rect):
+        """
+        Report a changed area.
+
+        Args:
+            rect (pygame.Rect): The area in screen coordinates, e.g. the return value of Surface.blit.
+        """
+        rect = self.screen_rect.clip(rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def full(self):
+        """Report that the whole screen changed"""
+        self.is_full = True
+
+    def get_changed(self):
+        """
+        Get the areas to push this frame.
+
+        Returns:
+            list: The changed areas of this and the last frame, None if the whole screen has to be pushed.
+        """
+        if self.is_full or self.previous is None:
+            return None
+        return self.rects + self.previous
+
+    def next_frame(self):
+        """Start a new frame"""
+        self.previous = None if self.is_full else self.rects
+        self.rects = []
+        self.is_full = False
+
+    def update_display(self):
+        """Push the changed areas of this and the last frame to the window and start a new frame"""
+        changed = self.get_changed()
+        if changed is None:
+            pygame.display.update()
+        elif changed:
+            pygame.display.update(changed)
+        self.next_frame()
+
+
+_dirty_rects = None
+
+
+def get_dirty_rects():
+    """
+    Get the dirty rectangle tracker of this process, creating it on first use.
+
+    Returns:
+        DirtyRects: The shared tracker.
+    """
+    global _dirty_rects
+    if _dirty_rects is None:
+        surface = pygame.display.get_surface()
+        _dirty_rects = DirtyRects(surface.get_size()) if surface else DirtyRects()
+    return _dirty_rects
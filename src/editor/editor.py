@@ -10,17 +10,27 @@ from pygame.mouse import get_pos as mouse_pos, get_pressed as mouse_buttons
 
 from src.settings import WINDOW_HEIGHT, WINDOW_WIDTH
 from src.save_manager import SaveManager
+from src.backend import get_backend
+from src.dirty_rects import get_dirty_rects
+from src.render_queue import RenderQueue
+from src.animation import get_animation_registry
+from src.sky import SkyRenderer
 from src.editor.menu import Menu
 from src.editor.settings import (
     TILE_SIZE, MENU_MARGIN, ANIMATION_SPEED, EDITOR_DATA,
-    SKY_COLOR, HORIZON_COLOR, HORIZON_TOP_COLOR
+    SKY_COLOR, HORIZON_COLOR, HORIZON_TOP_COLOR, SKY_GRADIENT
 )
 
 
 class Editor:
     def __init__(self):
         # Main setup
-        self.display_surface = pygame.display.get_surface()
+        # The editor draws with pygame.draw and fonts, everything goes onto the canvas of the backend
+        self.backend = get_backend()
+        self.display_surface = self.backend.get_canvas()
+        self.dirty_rects = get_dirty_rects()
+        self.render_queue = RenderQueue(self.display_surface)
+        self.sky = SkyRenderer((WINDOW_WIDTH, WINDOW_HEIGHT))
         self.last_selected_cell = None
 
         # Fonts
@@ -50,6 +60,9 @@ class Editor:
         # Animation
         self.animation_index = 0
 
+        # Translucent copies of the images on layers below the current one
+        self.faded_images = {}  # (image, alpha) -> pygame.Surface
+
         # Save
         self.last_colliders_len = 0
         self.last_tiles_len = 0
@@ -261,6 +274,10 @@ class Editor:
                     pygame.quit()
                     sys.exit()
 
+            # Hovering only changes the buttons, any other input can change the whole canvas
+            if event.type != pygame.MOUSEMOTION or any(event.buttons):
+                self.dirty_rects.full()
+
             self.pan_input(event)
             self.buttons_is_over()
             self.menu_click(event)
@@ -701,6 +718,7 @@ class Editor:
         self.collider_data = {}
         self.free_move = False
         self.animation_index = 0
+        self.faded_images = {}
         self.last_colliders_len = None
         self.last_tiles_len = None
 
@@ -758,6 +776,7 @@ class Editor:
         for button in self.buttons:
             button.update()
             button.draw(self.display_surface)
+            self.dirty_rects.add(button.rect)
 
     def buttons_is_over(self):
         """Check if any button is being hovered over."""
@@ -770,40 +789,11 @@ class Editor:
 
     # Drawing methods
     def display_sky(self):
-        """Display the sky and horizon on the display surface."""
-
-        def draw_horizon_lines():
-            """Draw the horizon lines on the display surface."""
-            # Define the positions and heights of the horizon lines
-            horizon_lines = [
-                (self.origin.y - 5, 10),
-                (self.origin.y - 12, 4),
-                (self.origin.y - 18, 2)
-            ]
-            # Draw each horizon line
-            for y, height in horizon_lines:
-                rect = pygame.Rect(0, y, WINDOW_WIDTH, height)
-                pygame.draw.rect(self.display_surface, HORIZON_TOP_COLOR, rect)
-
-        # Fill the background with the sky color
-        self.display_surface.fill(SKY_COLOR)
-
-        # If the origin is above the visible window, only draw the sky
-        if self.origin.y > WINDOW_HEIGHT + 18:
-            return
-
-        # If the origin is within the visible window, draw the ground and horizon lines
-        if -18 <= self.origin.y <= WINDOW_HEIGHT + 18:
-            # Draw the ground
-            ground_rect = pygame.Rect(0, self.origin.y - 5, WINDOW_WIDTH, WINDOW_HEIGHT + 18)
-            pygame.draw.rect(self.display_surface, HORIZON_COLOR, ground_rect)
-
-            # Draw the horizon lines
-            draw_horizon_lines()
-            return
-
-        # If the origin is below the visible window, fill the background with the ground color
-        self.display_surface.fill(HORIZON_COLOR)
+        """Display the sky, the endless ground and the horizon lines on the display surface."""
+        self.sky.draw(
+            self.display_surface, int(self.origin.y - 5),
+            SKY_COLOR, HORIZON_COLOR, HORIZON_TOP_COLOR, SKY_GRADIENT
+        )
 
     def draw_tile_lines(self):
         """Draw the grid lines on the display surface."""
@@ -831,18 +821,18 @@ class Editor:
         y = int(self.origin[1] - (WINDOW_HEIGHT // 2))
 
         coords = self.main_font.render(f'X: {x} Y: {y}', True, (204, 0, 0))
-        self.display_surface.blit(
+        self.dirty_rects.add(self.display_surface.blit(
             coords,
             (WINDOW_WIDTH - (MENU_MARGIN * 2) - coords.get_width(), MENU_MARGIN * 2)
-        )
+        ))
 
     def draw_layer_num(self):
         """Draw the current layer number on the display surface."""
         layers = self.main_font.render(f'Слой: {self.layer + 1}', True, (180, 0, 0))
-        self.display_surface.blit(
+        self.dirty_rects.add(self.display_surface.blit(
             layers,
             (WINDOW_WIDTH - (MENU_MARGIN * 2) - layers.get_size()[0], MENU_MARGIN * 4 + layers.get_height())
-        )
+        ))
 
     def draw_layers(self, dt):
         """
@@ -852,22 +842,24 @@ class Editor:
             dt (float): The delta time since the last frame.
         """
         self.animation_index += ANIMATION_SPEED * dt
-        index = int(self.animation_index)
+        get_animation_registry().update(int(self.animation_index))
 
         for layer in range(1, self.layer + 1):
-            self.draw_layer(layer, dt, index)
+            self.draw_layer(layer)
 
-    def draw_layer(self, layer, dt, index):
+    def draw_layer(self, layer):
         for cell, canvas in self.canvas_data[layer].items():
             pos = self.get_position(canvas, cell)
             if self.is_within_visible_bounds(pos, canvas.size):
-                self.draw_canvas_item(canvas, pos, layer, dt, index)
+                self.draw_canvas_item(canvas, pos, layer)
 
         if layer == 9:
             for cell, collider in self.collider_data.items():
                 pos = self.get_cell_coordinates(cell)
                 if self.is_within_screen_bounds(pos):
-                    self.display_surface.blit(collider.draw_image, pos)
+                    self.render_queue.add(collider.draw_image, pos)
+
+        self.render_queue.flush()
 
     def get_position(self, canvas, cell):
         if canvas.free_pos:
@@ -881,24 +873,39 @@ class Editor:
     def is_within_screen_bounds(self, pos):
         return (-64 < pos[0] < WINDOW_WIDTH and -64 < pos[1] < WINDOW_HEIGHT)
 
-    def draw_canvas_item(self, canvas, pos, layer, dt, index):
-        alpha = max(0, 255 - (self.layer - layer) * 15)
-        draw_image = canvas.draw_image.copy()
-
+    def draw_canvas_item(self, canvas, pos, layer):
+        draw_image = canvas.draw_image
         if layer != self.layer:
-            draw_image.set_alpha(alpha)
+            draw_image = self.get_faded_image(draw_image, max(0, 255 - (self.layer - layer) * 15))
 
-        canvas.animation_update(dt, index)
-        self.display_surface.blit(draw_image, pos)
+        self.render_queue.add(draw_image, pos, dirty=bool(canvas.animation))
         self.draw_canvas_text(canvas, pos)
 
+    def get_faded_image(self, image, alpha):
+        """
+        Get a translucent copy of an image, made once per image and alpha.
+
+        Args:
+            image (pygame.Surface): The shared image of a canvas object.
+            alpha (int): The opacity of the copy.
+
+        Returns:
+            pygame.Surface: The translucent copy.
+        """
+        key = (image, alpha)
+        faded = self.faded_images.get(key)
+        if faded is None:
+            faded = self.faded_images[key] = image.copy()
+            faded.set_alpha(alpha)
+        return faded
+
     def draw_canvas_text(self, canvas, pos):
         if canvas.id is not None:
             color = self.get_canvas_color(canvas)
             if color:
                 tile_name = self.tile_font.render(canvas.id, True, color)
                 text_rect = tile_name.get_rect(center=(pos[0] + TILE_SIZE // 2, pos[1] - 10))
-                self.display_surface.blit(tile_name, text_rect)
+                self.render_queue.add(tile_name, text_rect)
 
     def get_canvas_color(self, canvas):
         if canvas.npc:
@@ -919,6 +926,7 @@ class Editor:
         self.event_loop()
 
         # Drawing
+        self.display_surface = self.backend.get_canvas()
         self.display_sky()  # Draw sky (layer 0)
         self.draw_layers(dt)  # Draw all layers
 
@@ -940,7 +948,7 @@ class Editor:
 
 
 class CanvasObject:
-    def __init__(self, index, inner_index, inner_mode=False, tile=(0, 0), layer=10, image=None, image_path='', free_pos=None, animation=None):
+    def __init__(self, index, inner_index, inner_mode=False, tile=(0, 0), layer=10, image=None, image_path='', free_pos=None, animation=None, ask_id=True):
         self.objects = []
         self.index = index
         self.inner_index = inner_index
@@ -962,15 +970,16 @@ class CanvasObject:
 
         # Animation attributes
         self.animation = animation
+        self.clip = get_animation_registry().get(animation)  # Shared by every object with this animation
         self.animation_dir = ''
 
         # Image attributes
         self.path_to_image = image_path
         self.image = image
         self.size = self.image.get_size() if image else (0, 0)
-        self.draw_image = self.image.copy() if image else None
+        self.static_image = self.image  # Shared with every object of this image
 
-        self.add_object_by_index()
+        self.add_object_by_index(ask_id)
 
     def get_npc_id(self):
         """
@@ -1009,8 +1018,13 @@ class CanvasObject:
 
         return answer
 
-    def add_object_by_index(self) -> None:
-        """Add an object to the canvas based on its index."""
+    def add_object_by_index(self, ask_id: bool = True) -> None:
+        """Add an object to the canvas based on its index.
+
+        Args:
+            ask_id (bool): Prompt for the id of items, enemies, events and NPCs.
+                Imported objects already carry their id.
+        """
         if self.index is None:
             return
 
@@ -1028,19 +1042,23 @@ class CanvasObject:
             case 'item':
                 self.item = True
                 layer_required = True
-                self.id = self.get_id_name('Название предмета', 'Введите название предмета:')
+                if ask_id:
+                    self.id = self.get_id_name('Название предмета', 'Введите название предмета:')
             case 'enemy':
                 self.enemy = True
                 layer_required = True
-                self.id = self.get_id_name('Название врага', 'Введите название врага:')
+                if ask_id:
+                    self.id = self.get_id_name('Название врага', 'Введите название врага:')
             case 'event':
                 self.event = True
                 layer_required = True
-                self.id = self.get_id_name('Название события', 'Введите название события:')
+                if ask_id:
+                    self.id = self.get_id_name('Название события', 'Введите название события:')
             case 'npc':
                 self.npc = True
                 layer_required = True
-                self.id = self.get_npc_id()
+                if ask_id:
+                    self.id = self.get_npc_id()
 
         if options['menu'] == 'collider':
             self.collision = True
@@ -1050,17 +1068,15 @@ class CanvasObject:
         if layer_required:
             self.layer = 10
 
-    def animation_update(self, dt, index):
+    @property
+    def draw_image(self):
         """
-        Update the animation frame of the object.
+        Get the image to draw.
 
-        Args:
-            dt (float): The delta time since the last frame.
-            index (int): The current animation frame index.
+        Returns:
+            pygame.Surface: The current animation frame, or the object image if it does not animate.
         """
-        if self.animation:
-            index %= len(self.animation)
-            self.draw_image = self.animation[index]
+        return self.clip.frame if self.clip else self.static_image
 
 
 class Button:
@@ -1,11 +1,13 @@
 """Menu system for the editor interface"""
-import os
 import math
 
 import pygame
 from pygame.image import load
 
 from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT
+from src.asset_index import get_asset_index
+from src.backend import get_backend
+from src.dirty_rects import get_dirty_rects
 from src.editor.settings import (
     TILE_SIZE, MENU_MARGIN, EDITOR_DATA,
     BUTTON_BG_COLOR, BUTTON_LINE_COLOR, MENU_LINE_COLOR
@@ -14,7 +16,7 @@ from src.editor.settings import (
 
 class Menu:
     def __init__(self):
-        self.display_surface = pygame.display.get_surface()
+        self.display_surface = get_backend().get_canvas()
         self.create_data()
         self.create_buttons()
 
@@ -41,14 +43,7 @@ class Menu:
         Returns:
             list: A list of file paths.
         """
-        parent_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-        directory_path = os.path.join(parent_path, directory_path)
-        items = os.listdir(directory_path)
-        return [
-            os.path.join(directory_path, item)
-            for item in items
-            if os.path.isfile(os.path.join(directory_path, item))
-        ]
+        return get_asset_index().files_in(directory_path)
 
     def create_data(self):
         """Create the data for the menu surfaces."""
@@ -262,7 +257,7 @@ class Menu:
             page (int): The current page number.
             inner_page (int): The current inner page number.
         """
-        self.display_surface.blit(self.shape_surf, self.rect.inflate(4, 4))
+        get_dirty_rects().add(self.display_surface.blit(self.shape_surf, self.rect.inflate(4, 4)))
         self.buttons.update(inner_page, self.max_items_on_page)
         self.draw_buttons_on_page(page)
         self.highlight_indicator(index, inner_index)
@@ -1,7 +1,7 @@
 """
 Editor-specific settings and configurations
 """
-from typing import Dict, Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
 # Core editor settings
@@ -17,6 +17,11 @@ EVENTS_PATH = GRAPHICS_PATH / 'events'
 PLAYER_PATH = GRAPHICS_PATH / 'player'
 TILES_PATH = GRAPHICS_PATH / 'tiles'
 BACKGROUNDS_PATH = GRAPHICS_PATH / 'backgrounds'
+DATA_PATH = ASSETS_PATH / 'data'
+
+# Generated caches
+ASSET_INDEX_PATH = DATA_PATH / 'asset_index.json'
+ATLAS_CACHE_PATH = DATA_PATH / 'atlas'
 
 # Editor data configuration
 EditorDataType = Dict[int, Dict[str, Union[str, Optional[str]]]]
@@ -164,3 +169,8 @@ HORIZON_TOP_COLOR = Colors.HORIZON_TOP
 BUTTON_BG_COLOR = Colors.BUTTON_BG
 BUTTON_LINE_COLOR = Colors.BUTTON_LINE
 MENU_LINE_COLOR = Colors.MENU_LINE
+
+# Optional sky gradient as [distance above the horizon, color] stops, None for a flat SKY_COLOR
+SkyGradientType = Optional[List[Tuple[int, str]]]
+
+SKY_GRADIENT: SkyGradientType = None
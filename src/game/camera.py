@@ -11,9 +11,14 @@ class Camera:
         """Initialize camera with viewport dimensions"""
         # Camera viewport
         self.viewport = pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.pos = Vector2(self.viewport.topleft)  # Exact viewport position, the viewport is rounded from it
         
         # Target position for smooth following
         self.target_pos = Vector2(0, 0)
+
+        # Fixed timestep, the viewport position of the previous tick and the view drawn between the two
+        self.previous_pos = Vector2(self.pos)
+        self.view = self.viewport.copy()
         
         # Camera movement parameters
         self.smoothness = 0.2  # Lower = smoother
@@ -34,14 +39,20 @@ class Camera:
         
         return target_x, target_y
 
-    def _apply_smooth_movement(self) -> None:
-        """Apply smooth movement towards target position"""
+    def _apply_smooth_movement(self, time_scale: float = 1.0) -> None:
+        """Apply smooth movement towards target position
+        
+        Args:
+            time_scale: Length of the tick in PHYSICS_REFERENCE_RATE ticks
+        """
         # Calculate smooth movement factor
         smooth_factor = (1 - math.cos(math.pi * self.smoothness)) / self.damping
+        if time_scale != 1:
+            smooth_factor = 1 - (1 - smooth_factor) ** time_scale  # Close the same share of the gap per second
         
         # Update camera position with smooth interpolation
-        self.viewport.x += (self.target_pos.x - self.viewport.x) * smooth_factor
-        self.viewport.y += (self.target_pos.y - self.viewport.y) * smooth_factor
+        self.pos += (self.target_pos - self.pos) * smooth_factor
+        self.viewport.topleft = (round(self.pos.x), round(self.pos.y))
 
     def apply(self, entity: pygame.sprite.Sprite) -> pygame.Rect:
         """Apply camera offset to entity position
@@ -54,23 +65,35 @@ class Camera:
         """
         return entity.rect.move(self.viewport.topleft)
 
-    def update(self, dt: float, level: 'Level', target: 'Player') -> None:
-        """Update camera position and render level
+    def tick(self, target: 'Player', dt: float = 1 / PHYSICS_REFERENCE_RATE) -> None:
+        """Move the camera towards its target by one simulation tick
         
         Args:
-            dt: Delta time
-            level: Current game level
             target: Entity to follow (usually player)
+            dt: Length of the tick in seconds
         """
+        self.previous_pos.update(self.pos)
+
         # Update target position
         target_x, target_y = self._calculate_target_position(target.rect)
         self.target_pos.update(target_x, target_y)
         
         # Apply smooth camera movement
-        self._apply_smooth_movement()
+        self._apply_smooth_movement(dt * PHYSICS_REFERENCE_RATE)
+
+    def update(self, dt: float, level: 'Level', alpha: float = 1.0) -> None:
+        """Render the level from between the previous and the current tick
         
+        Args:
+            dt: Delta time
+            level: Current game level
+            alpha: Position between the previous (0) and the current (1) tick
+        """
+        x, y = self.previous_pos.lerp(self.pos, alpha)
+        self.view.topleft = (round(x), round(y))
+
         # Update level camera target
-        level.update_target(self.viewport)
+        level.update_target(self.view)
         
         # Draw level with current camera position
-        level.draw(dt, self.viewport.topleft)
+        level.draw(dt, self.view.topleft)
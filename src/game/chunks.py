@@ -0,0 +1,222 @@
+"""
+Spatial chunk grid for level layers
+"""
+import math
+from collections import OrderedDict
+
+import pygame
+
+
+class ChunkGrid:
+    """Groups the objects of a layer into square chunks so drawing only visits the chunks on screen"""
+
+    def __init__(self, chunk_size):
+        """
+        Initialize an empty grid.
+
+        Args:
+            chunk_size (int): The width and height of a chunk in pixels.
+        """
+        self.chunk_size = chunk_size
+        self.chunks = {}  # (chunk x, chunk y) -> objects in insertion order
+
+        # Objects are stored in the chunk of their top-left corner, so queries
+        # reach back by the largest object size
+        self.max_width = 0
+        self.max_height = 0
+
+    def get_chunk_coords(self, pos):
+        """
+        Get the chunk that contains a position.
+
+        Args:
+            pos (tuple): The position in level coordinates.
+
+        Returns:
+            tuple: The chunk coordinates.
+        """
+        return math.floor(pos[0] / self.chunk_size), math.floor(pos[1] / self.chunk_size)
+
+    def add(self, obj):
+        """
+        Add an object with pos and size attributes.
+
+        Args:
+            obj: The object to add.
+        """
+        self.chunks.setdefault(self.get_chunk_coords(obj.pos), []).append(obj)
+        self.max_width = max(self.max_width, obj.size[0])
+        self.max_height = max(self.max_height, obj.size[1])
+
+    def remove(self, obj):
+        """
+        Remove an object that was added before.
+
+        Args:
+            obj: The object to remove.
+        """
+        key = self.get_chunk_coords(obj.pos)
+        chunk = self.chunks.get(key)
+        if chunk and obj in chunk:
+            chunk.remove(obj)
+            if not chunk:
+                del self.chunks[key]
+
+    def get_chunk_range(self, rect):
+        """
+        Get the chunks that can hold objects overlapping a rectangle.
+
+        Args:
+            rect (pygame.Rect): The area in level coordinates.
+
+        Returns:
+            tuple: The first and last chunk column and row.
+        """
+        first_x, first_y = self.get_chunk_coords((rect.left - self.max_width, rect.top - self.max_height))
+        last_x, last_y = self.get_chunk_coords((rect.right - 1, rect.bottom - 1))
+        return first_x, first_y, last_x, last_y
+
+    def query(self, rect):
+        """
+        Get the chunks that can hold objects overlapping a rectangle.
+
+        Args:
+            rect (pygame.Rect): The area in level coordinates.
+
+        Yields:
+            tuple: The chunk coordinates and the objects of every non-empty chunk.
+        """
+        first_x, first_y, last_x, last_y = self.get_chunk_range(rect)
+        chunks = self.chunks
+
+        for chunk_y in range(first_y, last_y + 1):
+            for chunk_x in range(first_x, last_x + 1):
+                chunk = chunks.get((chunk_x, chunk_y))
+                if chunk:
+                    yield (chunk_x, chunk_y), chunk
+
+
+def bake_premultiplied(size, blits):
+    """
+    Composite images into a new surface with premultiplied alpha.
+
+    Soft edges of the result look the same as when the images are blitted one
+    by one onto the screen, as long as it is drawn with BLEND_PREMULTIPLIED.
+
+    Args:
+        size (tuple): The size of the new surface.
+        blits (iterable): The (image, position) pairs in drawing order.
+
+    Returns:
+        pygame.Surface: The premultiplied surface.
+    """
+    surface = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+    surface.fill((0, 0, 0, 0))
+
+    # Atlas regions are subsurfaces, which premul_alpha does not handle, so premultiply a copy
+    premultiplied = {}
+    for image, pos in blits:
+        baked_image = premultiplied.get(id(image))
+        if baked_image is None:
+            baked_image = premultiplied[id(image)] = image.copy().premul_alpha()
+        surface.blit(baked_image, pos, special_flags=pygame.BLEND_PREMULTIPLIED)
+    return surface
+
+
+class BakedChunk:
+    """The static tiles of a chunk pre-rendered into one surface"""
+
+    def __init__(self, objects):
+        """
+        Bake the objects of a chunk that never animate.
+
+        Args:
+            objects (list): The objects of the chunk in drawing order.
+        """
+        static = [obj for obj in objects if not obj.animation and obj.draw_image]
+        self.animated = [obj for obj in objects if obj.animation]
+        self.surface = None
+        self.pos = (0, 0)
+        self.last_frame = None  # Frame of the ChunkCache the chunk was last drawn in
+
+        if not static:
+            return
+
+        # Trim the surface to the area the static tiles cover
+        rects = [obj.draw_image.get_rect(topleft=obj.pos) for obj in static]
+        bounds = rects[0].unionall(rects[1:])
+        self.pos = bounds.topleft
+        self.surface = bake_premultiplied(
+            bounds.size,
+            [(obj.draw_image, rect.move(-bounds.x, -bounds.y)) for obj, rect in zip(static, rects)]
+        )
+
+    @property
+    def nbytes(self):
+        """Memory used by the baked surface"""
+        if self.surface is None:
+            return 0
+        return self.surface.get_width() * self.surface.get_height() * self.surface.get_bytesize()
+
+
+class ChunkCache:
+    """
+    Least recently used cache of baked chunks that stays within a memory budget.
+
+    Chunks drawn in the current frame are never evicted. When the chunks on
+    screen need more than the budget the cache grows past it instead of
+    baking them again every frame, and shrinks back once they scroll away.
+    """
+
+    def __init__(self, budget):
+        """
+        Initialize an empty cache.
+
+        Args:
+            budget (int): The memory budget for baked surfaces in bytes.
+        """
+        self.budget = budget
+        self.used = 0
+        self.entries = OrderedDict()  # key -> BakedChunk, least recently used first
+        self.frame = 0  # Chunks with this last_frame are on screen
+
+    def next_frame(self):
+        """Start a new frame, the chunks of the last one may be evicted again"""
+        self.frame += 1
+
+    def get(self, key, objects):
+        """
+        Get the baked chunk for a key, baking it on a miss.
+
+        Args:
+            key (tuple): The layer and chunk coordinates.
+            objects (list): The objects of the chunk.
+
+        Returns:
+            BakedChunk: The baked chunk.
+        """
+        baked = self.entries.get(key)
+        if baked is not None:
+            self.entries.move_to_end(key)
+            baked.last_frame = self.frame
+            return baked
+
+        baked = BakedChunk(objects)
+        baked.last_frame = self.frame
+        self.entries[key] = baked
+        self.used += baked.nbytes
+        self._evict()
+        return baked
+
+    def _evict(self):
+        """Drop the least recently used chunks until the cache fits the budget or only holds chunks on screen"""
+        while self.used > self.budget:
+            baked = next(iter(self.entries.values()))
+            if baked.last_frame == self.frame:
+                break
+            self.used -= self.entries.popitem(last=False)[1].nbytes
+
+    def clear(self):
+        """Drop every baked chunk"""
+        self.entries.clear()
+        self.used = 0
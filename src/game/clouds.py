@@ -0,0 +1,89 @@
+"""
+Cloud layer simulation
+
+The clouds of a level are stored as NumPy arrays, so moving, recycling and
+culling them are a few vector operations per frame no matter how many clouds
+the sky holds. Only the clouds on screen are handed back for drawing.
+"""
+import numpy as np
+
+from src.settings import WINDOW_WIDTH, WINDOW_HEIGHT
+
+# Horizontal speed of a cloud in pixels per frame, before CLOUD_SPEED_SCALE
+CLOUD_SPEED_RANGE: tuple = (0.2, 0.5)
+CLOUD_SPEED_SCALE: float = 0.6
+
+# Random vertical variation of a cloud around CLOUD_BASE_Y
+CLOUD_Y_OFFSET_RANGE: tuple = (-200, 150)
+CLOUD_BASE_Y: int = 100
+
+# How much of the camera's vertical movement the cloud layer follows
+CLOUD_PARALLAX: float = 0.05
+
+
+class CloudField:
+    """The clouds of a level as parallel arrays"""
+
+    def __init__(self, canvases, start_width, end_width, seed=None):
+        """
+        Scatter the clouds across the level.
+
+        Args:
+            canvases (list): The cloud objects with pos, size and draw_image.
+            start_width (float): The left edge of the level.
+            end_width (float): The right edge of the level.
+            seed (int): Seed for the random placement, None for a random sky.
+        """
+        self.canvases = list(canvases)
+        self.start_width = start_width
+        self.end_width = end_width
+        self.rng = np.random.default_rng(seed)
+
+        count = len(self.canvases)
+        self.x = np.array([canvas.pos[0] for canvas in self.canvases], dtype=float)
+        self.width = np.array([canvas.size[0] for canvas in self.canvases], dtype=float)
+        self.height = np.array([canvas.size[1] for canvas in self.canvases], dtype=float)
+        self.speed = self.rng.uniform(*CLOUD_SPEED_RANGE, count)
+        self.offset = self.rng.uniform(start_width, end_width, count)
+        self.y_offset = self.rng.uniform(*CLOUD_Y_OFFSET_RANGE, count)
+
+    def __len__(self):
+        """Number of clouds in the sky"""
+        return len(self.canvases)
+
+    def update(self, target_y):
+        """
+        Move the clouds one frame and get the ones on screen.
+
+        Clouds that drifted past the right edge of the level are drawn at their
+        current position once more and start over left of the level next frame.
+
+        Args:
+            target_y (float): The vertical camera target.
+
+        Returns:
+            list: The (cloud object, screen position) of every visible cloud in level order.
+        """
+        self.offset += self.speed * CLOUD_SPEED_SCALE
+        x = self.x + self.offset
+        y = CLOUD_BASE_Y + self.y_offset + target_y * CLOUD_PARALLAX
+
+        visible = np.flatnonzero(
+            (x + self.width > -self.width) & (x < WINDOW_WIDTH + self.width)
+            & (y + self.height > -self.height) & (y < WINDOW_HEIGHT + self.height)
+        )
+        clouds = [
+            (self.canvases[index], pos)
+            for index, pos in zip(visible.tolist(), zip(x[visible].tolist(), y[visible].tolist()))
+        ]
+
+        self._recycle(x)
+        return clouds
+
+    def _recycle(self, x):
+        """Send the clouds past the right edge of the level back to its left edge"""
+        recycled = x > (self.end_width // 2) + WINDOW_WIDTH + self.width
+        count = np.count_nonzero(recycled)
+        if count:
+            self.offset[recycled] = self.start_width - WINDOW_WIDTH - self.width[recycled]
+            self.y_offset[recycled] = self.rng.uniform(*CLOUD_Y_OFFSET_RANGE, count)
@@ -0,0 +1,245 @@
+"""
+Collision geometry for level colliders
+
+At load time the edges of the colliders are merged into spans: touching
+edges of the same direction on the same line become one long rectangle, so
+a floor of colliders is tested as a single edge. The collision world keeps
+the spans as NumPy arrays, one per coordinate, and finds the spans that
+overlap a rectangle with one vectorized mask over the chunks around it.
+
+Edges are one-sided: a left edge stops movement to the left, a down edge
+stops movement downwards and so on. Sweeping a rectangle along its movement
+stops it on the first edge facing it that its leading side reaches, covering
+the edge the way the player rests against it, so movement longer than an edge
+is thick can not tunnel through it.
+"""
+import numpy as np
+
+from src.settings import CHUNK_SIZE
+
+# Edge directions in the order Collider.check_collision reports them
+EDGE_DIRECTIONS: tuple = ('left', 'right', 'up', 'down')
+LEFT, RIGHT, UP, DOWN = range(len(EDGE_DIRECTIONS))
+
+
+class ColliderSpan:
+    """Touching edges of the same direction merged into one rectangle, checked like a Collider"""
+
+    def __init__(self, direction, rect, pos, size, order):
+        """
+        Initialize the span.
+
+        Args:
+            direction (str): The edge direction, one of EDGE_DIRECTIONS.
+            rect (pygame.Rect): The edge rectangle of the first collider, grown by extend.
+            pos (tuple): The position of the first collider.
+            size (int): The size of the colliders.
+            order (int): The level order of the first collider.
+        """
+        self.direction = direction
+        self.rect = rect
+        self.pos = pos
+        self.size = size
+        self.order = order
+        self.cells = [pos]  # Positions of the merged colliders, the keys of Level.collider_data
+        self.hit = tuple(direction == name for name in EDGE_DIRECTIONS)
+        self.miss = (False, False, False, False)
+
+    def extend(self, rect, pos):
+        """Grow the span over the touching edge rectangle of another collider"""
+        self.rect.union_ip(rect)
+        self.cells.append(pos)
+
+    def check_collision(self, rect):
+        """Check collision with provided rectangle, in the (left, right, up, down) form of Collider"""
+        return self.hit if self.rect.colliderect(rect) else self.miss
+
+
+def merge_edges(colliders):
+    """
+    Merge the edges of colliders into spans.
+
+    Edges are merged when they have the same direction and size, lie on the
+    same line and touch end to end. The player only uses the line of an edge
+    and the collider size, which every edge of a span shares, so a span
+    collides like the edges it replaces.
+
+    Args:
+        colliders (iterable): The colliders in level order.
+
+    Returns:
+        list: The spans, ordered by their first collider in level order.
+    """
+    # (direction, size, line) -> edges as (start along the line, rect, pos, order)
+    lines = {}
+    for order, collider in enumerate(colliders):
+        for direction, rect in collider.rects.items():
+            vertical = direction in ('left', 'right')
+            line = rect.x if vertical else rect.y
+            start = rect.y if vertical else rect.x
+            lines.setdefault((direction, collider.size, line), []).append((start, rect, collider.pos, order))
+
+    spans = []
+    for (direction, size, _), edges in lines.items():
+        edges.sort(key=lambda edge: edge[0])
+        span = None
+        for start, rect, pos, order in edges:
+            if span is not None and start == span_end:
+                span.extend(rect, pos)
+                span.order = min(span.order, order)
+            else:
+                span = ColliderSpan(direction, rect.copy(), pos, size, order)
+                spans.append(span)
+            span_end = start + size
+
+    spans.sort(key=lambda span: span.order)
+    return spans
+
+
+class CollisionWorld:
+    """Finds the merged collider edges of a level that overlap a rectangle"""
+
+    def __init__(self, tile_size, colliders=(), chunk_size=CHUNK_SIZE):
+        """
+        Initialize the world.
+
+        Args:
+            tile_size (int): The width and height of a tile in pixels.
+            colliders (iterable): The colliders of the level in level order.
+            chunk_size (int): The width and height of a chunk in tiles.
+        """
+        self.tile_size = tile_size
+        self.chunk_size = chunk_size * tile_size
+        self.spans = merge_edges(colliders)
+
+        # Struct of arrays, index i is the span self.spans[i]
+        rects = [span.rect for span in self.spans]
+        self.x0 = np.array([rect.left for rect in rects], dtype=np.int64)
+        self.y0 = np.array([rect.top for rect in rects], dtype=np.int64)
+        self.x1 = np.array([rect.right for rect in rects], dtype=np.int64)
+        self.y1 = np.array([rect.bottom for rect in rects], dtype=np.int64)
+        self.kind = np.array([EDGE_DIRECTIONS.index(span.direction) for span in self.spans], dtype=np.int8)
+
+        # A move no longer than the thinnest edge ends on or next to every edge it reaches
+        widths, heights = self.x1 - self.x0, self.y1 - self.y0
+        self.edge_thickness = int(np.minimum(widths, heights).min()) if self.spans else 0
+
+        # (chunk x, chunk y) -> sorted indices of the spans crossing the chunk
+        chunks = {}
+        for index, rect in enumerate(rects):
+            first_x, first_y, last_x, last_y = self.get_chunk_range(rect.left, rect.top, rect.right, rect.bottom)
+            for chunk_y in range(first_y, last_y + 1):
+                for chunk_x in range(first_x, last_x + 1):
+                    chunks.setdefault((chunk_x, chunk_y), []).append(index)
+        self.chunks = {key: np.array(indices, dtype=np.intp) for key, indices in chunks.items()}
+
+    def __len__(self):
+        return len(self.spans)
+
+    def get_chunk_range(self, left, top, right, bottom):
+        """
+        Get the chunks an area overlaps.
+
+        Returns:
+            tuple: The first and last chunk column and row.
+        """
+        size = self.chunk_size
+        return int(left // size), int(top // size), int((right - 1) // size), int((bottom - 1) // size)
+
+    def overlaps(self, rect, margin=0):
+        """
+        Get the spans that overlap a rectangle.
+
+        Args:
+            rect (pygame.Rect): The area in level coordinates.
+            margin (int): Pixels added around the area.
+
+        Returns:
+            numpy.ndarray: The span indices in level order.
+        """
+        left, top = rect.left - margin, rect.top - margin
+        right, bottom = rect.right + margin, rect.bottom + margin
+        first_x, first_y, last_x, last_y = self.get_chunk_range(left, top, right, bottom)
+
+        parts = []
+        for chunk_y in range(first_y, last_y + 1):
+            for chunk_x in range(first_x, last_x + 1):
+                indices = self.chunks.get((chunk_x, chunk_y))
+                if indices is not None:
+                    parts.append(indices)
+
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        indices = parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+        mask = ((self.x0[indices] < right) & (self.x1[indices] > left)
+                & (self.y0[indices] < bottom) & (self.y1[indices] > top))
+        found = indices[mask]
+
+        # A span crosses several chunks, keep it once. Few spans are left, which
+        # a set sorts faster than numpy.unique
+        if len(parts) > 1 and found.size > 1:
+            found = np.array(sorted(set(found.tolist())), dtype=np.intp)
+        return found
+
+    def query(self, rect, margin=1):
+        """
+        Get the spans near a rectangle.
+
+        Args:
+            rect (pygame.Rect): The area in level coordinates.
+            margin (int): Tiles added around the area, for rectangles that move while the spans are handled.
+
+        Returns:
+            list: The spans in level order, checked one by one with check_collision.
+        """
+        spans = self.spans
+        return [spans[index] for index in self.overlaps(rect, margin * self.tile_size)]
+
+    def sweep(self, start, end):
+        """
+        Move a rectangle from start to end, first along x and then along y.
+
+        A move that reaches an edge facing it stops with the leading side of
+        the rectangle covering the edge, where check_collision reports the hit
+        on the next tick. An edge the rectangle already covers stops it again,
+        edges further behind its leading side are left to check_collision.
+
+        Args:
+            start (pygame.Rect): The rectangle before the move.
+            end (pygame.Rect): The rectangle after the move, the same size as start.
+
+        Returns:
+            pygame.Rect: The rectangle where the move stops.
+        """
+        moved = start.copy()
+
+        dx = end.x - start.x
+        moved.x = self._sweep_axis(start, dx, 0) if abs(dx) > self.edge_thickness else end.x
+        dy = end.y - start.y
+        moved.y = self._sweep_axis(moved, 0, dy) if abs(dy) > self.edge_thickness else end.y
+        return moved
+
+    def _sweep_axis(self, rect, dx, dy):
+        """Get the position on the axis of the move where a rectangle moving by dx or dy stops"""
+        end = rect.move(dx, dy)
+        indices = self.overlaps(rect.union(end))
+        kind = self.kind[indices]
+
+        # Edges the move carries the leading side past, the nearest one stops it. An edge
+        # the rectangle rests against still counts, so it can not be stepped through
+        if dx < 0:
+            indices = indices[kind == LEFT]
+            ahead = indices[(self.x0[indices] <= rect.left) & (self.x0[indices] > end.left)]
+            return int(self.x0[ahead].max()) if ahead.size else end.x
+        if dx > 0:
+            indices = indices[kind == RIGHT]
+            ahead = indices[(self.x1[indices] >= rect.right) & (self.x1[indices] < end.right)]
+            return int(self.x1[ahead].min()) - rect.width if ahead.size else end.x
+        if dy < 0:
+            indices = indices[kind == UP]
+            ahead = indices[(self.y0[indices] <= rect.top) & (self.y0[indices] > end.top)]
+            return int(self.y0[ahead].max()) if ahead.size else end.y
+        indices = indices[kind == DOWN]
+        ahead = indices[(self.y1[indices] >= rect.bottom) & (self.y1[indices] < end.bottom)]
+        return int(self.y1[ahead].min()) - rect.height if ahead.size else end.y
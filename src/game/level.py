@@ -1,23 +1,36 @@
 import pygame
-import random
 import math
 
 from pygame.math import Vector2
 
 from src.settings import *
 from src.save_manager import SaveManager
+from src.game.chunks import ChunkGrid, ChunkCache
+from src.game.collision import CollisionWorld
+from src.game.clouds import CloudField
+from src.game.parallax import ParallaxStrip
+from src.sky import SkyRenderer
+from src.backend import get_backend
+from src.dirty_rects import get_dirty_rects
+from src.profiler import get_profiler
+from src.render_queue import RenderQueue
+from src.animation import get_animation_registry
 
 
 class Level:
     """Represents the game level"""
 
-    def __init__(self, path, switch, player):
-        """Initialize level with path, switch, and player"""
+    def __init__(self, path, switch, player, seed=None):
+        """Initialize level with path, switch, player and an optional seed for the random cloud placement"""
         # Main setup
-        self.display_surface = pygame.display.get_surface()
+        self.display_surface = get_backend().target
+        # The canvas shows the window's view of the level, the queue scales positions and art down to it
+        self.render_scale = self.display_surface.get_width() / WINDOW_WIDTH
+        self.render_queue = RenderQueue(self.display_surface, self.render_scale)
         self.switch = switch
         self.player = player
         self.path = path
+        self.seed = seed
 
         # Camera origin point
         self.origin = Vector2(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
@@ -25,8 +38,12 @@ class Level:
         # Layer management
         self.canvas_data = {i: {} for i in range(15)}
         self.collider_data = {}
+        self.collision_world = None
+        self.chunk_grids = {}
+        self.chunk_cache = ChunkCache(CHUNK_CACHE_BUDGET_MB * 1024 * 1024)
 
-        # Animation state
+        # Animation state, every animation is advanced once per frame
+        self.animations = get_animation_registry()
         self.animation_index = 0
         self.tile_size = None
         self.animation_speed = None
@@ -36,6 +53,14 @@ class Level:
         self.sky_color = None
         self.horizon_color = None
         self.horizon_top_color = None
+        self.sky_gradient = None
+        self.sky = SkyRenderer(self.display_surface.get_size(), WINDOW_HEIGHT + 18, self.render_scale)
+
+        # Dirty rectangle tracking, the whole screen changes when the view moves
+        self.dirty_rects = get_dirty_rects()
+        self.profiler = get_profiler()
+        self.horizon_y = None
+        self.last_view = None
 
         # Scene initialization
         self.save_manager = SaveManager(TileObject, Collider, False)
@@ -61,7 +86,7 @@ class Level:
         # Clouds layer (layer 2)
         self.clouds_vector = self.origin.copy()
         self.clouds_delay = 0.1
-        self.clouds = {}
+        self.clouds = None
         self.initialize_clouds()
         
         # Background layers (layer 3), (layer 4)
@@ -80,106 +105,32 @@ class Level:
         self.sky_vector.y += (self.target.y - self.sky_vector.y) * (1 - math.cos(math.pi * self.sky_delay))
         y = self.origin.y - self.sky_vector.y - 35
 
-        # Background layers
-        self.display_surface.fill(self.sky_color)
-        
-        # Ground and horizon rendering
-        self._render_horizon_layers(y)
-
-    def _render_horizon_layers(self, y):
-        """Render ground and horizon line layers"""
-        # Main ground layer
-        ground_rect = pygame.Rect(0, -y - 5, WINDOW_WIDTH, WINDOW_HEIGHT + 18)
-        pygame.draw.rect(self.display_surface, self.horizon_color, ground_rect)
-
-        # Multiple horizon lines for depth effect
-        horizon_lines = [
-            (-y - 5, 10),
-            (-y - 12, 4),
-            (-y - 18, 2)
-        ]
-        for line_y, height in horizon_lines:
-            rect = pygame.Rect(0, line_y, WINDOW_WIDTH, height)
-            pygame.draw.rect(self.display_surface, self.horizon_top_color, rect)
+        # Sky, ground and horizon lines from the cached sky surface
+        self.horizon_y = int(-y - 5)
+        self.sky.draw(
+            self.display_surface, self.horizon_y,
+            self.sky_color, self.horizon_color, self.horizon_top_color, self.sky_gradient
+        )
 
     # Clouds (layer 2)
     def initialize_clouds(self):
         """Initialize cloud objects with randomized properties"""
-        for cell, canvas in self.canvas_data[1].items():
-            self.clouds[cell] = {
-                'canvas': canvas,
-                'speed': random.uniform(0.2, 0.5),  # Base movement speed
-                'offset': random.uniform(self.start_width, self.end_width),  # Initial horizontal offset
-                'y_offset': random.uniform(-200, 150)  # Vertical variation
-            }
-    
-    def display_clouds(self, index):
+        self.clouds = CloudField(self.canvas_data[1].values(), self.start_width, self.end_width, self.seed)
+
+    def display_clouds(self):
         """Update and render cloud layer with parallax effect"""
         # Update cloud layer position
         self._update_cloud_layer()
 
-        # Process each cloud
-        for data in self.clouds.values():
-            self._process_cloud(data, index)
+        # Move every cloud at once, only the visible ones are drawn
+        for canvas, pos in self.clouds.update(self.target.y):
+            self.render_queue.add(canvas.draw_image, pos, dirty=True)
+        self.render_queue.flush()
 
     def _update_cloud_layer(self):
         """Update the overall cloud layer position"""
         self.clouds_vector.y += (self.target.y - self.clouds_vector.y) * self.clouds_delay
 
-    def _process_cloud(self, data, index):
-        """Process individual cloud movement and rendering"""
-        canvas = data['canvas']
-        pos = list(canvas.pos)
-        cloud_width = canvas.size[0]
-        cloud_height = canvas.size[1]
-
-        # Ensure cloud data initialization
-        self._ensure_cloud_data(data)
-
-        # Update cloud position
-        screen_pos = self._update_cloud_position(pos, data)
-
-        # Handle cloud recycling
-        self._handle_cloud_recycling(screen_pos, data, cloud_width)
-
-        # Render cloud if visible
-        if self._is_cloud_visible(screen_pos, cloud_width, cloud_height):
-            canvas.animation_update(index)
-            self.display_surface.blit(canvas.draw_image, screen_pos)
-
-    @staticmethod
-    def _ensure_cloud_data(data):
-        """Ensure all necessary cloud data exists"""
-        if 'offset' not in data:
-            data['offset'] = 0
-        if 'y_offset' not in data:
-            data['y_offset'] = random.uniform(-200, 150)
-
-    def _update_cloud_position(self, pos, data):
-        """Calculate cloud position with smooth movement"""
-        data['offset'] += data['speed'] * 60 * 0.01
-        screen_pos = list(self.get_free_pos_coordinates(pos))
-        
-        # Update positions with parallax effect
-        screen_pos[0] = pos[0] + data['offset']
-        screen_pos[1] = 100 + data['y_offset'] + (self.target.y * 0.05)
-        
-        return screen_pos
-
-    def _handle_cloud_recycling(self, screen_pos, data, cloud_width):
-        """Handle cloud recycling when moving off location"""
-        if screen_pos[0] > (self.end_width // 2) + WINDOW_WIDTH + cloud_width:
-            data['offset'] = self.start_width - WINDOW_WIDTH - cloud_width
-            data['y_offset'] = random.uniform(-200, 150)
-
-    @staticmethod
-    def _is_cloud_visible(pos, width, height):
-        """Check if cloud is within visible screen bounds"""
-        return (pos[0] + width > -width and 
-                pos[0] < WINDOW_WIDTH + width and
-                pos[1] + height > -height and 
-                pos[1] < WINDOW_HEIGHT + height)
-        
     # Background layers (layer 3), (layer 4)
     def _setup_background_layers(self):
         """Initialize background layers for parallax effect"""
@@ -199,61 +150,29 @@ class Level:
 
     def initialize_background_tiles(self):
         """Initialize background tiles for layers"""
-        # Use existing tiles from canvas_data
+        # Use existing tiles from canvas_data, every tile repeats next to itself
         for layer in range(2, 4):
             for canvas in self.canvas_data[layer].values():
                 self.background_layers[layer]['tiles'].append(canvas)
+            self.background_layers[layer]['strip'] = ParallaxStrip(self.background_layers[layer]['tiles'])
 
-    def display_background_layers(self, index):
+    def display_background_layers(self):
         """Render background layers with parallax effect"""
         for layer_data in self.background_layers.values():
             self._update_background_layer(layer_data)
-            self._render_background_layer(layer_data, index),
+            self._render_background_layer(layer_data)
+        self.render_queue.flush()
 
     def _update_background_layer(self, layer_data):
         """Update the background layer position for parallax effect"""
         layer_data['vector'].x = self.origin.x * layer_data['delay']
         layer_data['vector'].y = self.origin.y - (self.origin.y * layer_data['delay']) + 200
 
-    def _render_background_layer(self, layer_data, index):
+    def _render_background_layer(self, layer_data):
         """Render a specific background layer"""
-        # Render tiles and check for off-screen repositioning
-        for tile in layer_data['tiles']:
-            # Calculate the position for the tile
-            y_offset = layer_data['vector'].y + tile.pos[1]
-            tile_pos = tile.pos[0] + layer_data['vector'].x * layer_data['delay']
-
-            # Update animation if available
-            if tile.animation is not None:
-                tile.animation_update(index)  # Assuming you have an update method for animation
-
-            # Render the tile
-            self.display_surface.blit(tile.draw_image, (tile_pos, y_offset))
-
-            # Handle infinite background scrolling
-            if tile_pos < -tile.size[0]:
-                # Move the tile to the right by creating a new position
-                new_pos = (tile.pos[0] + self.end_width * len(layer_data['tiles']), tile.pos[1])
-                tile.pos = new_pos  # Update the tile's position
-            elif tile_pos > WINDOW_WIDTH:
-                # Move the tile to the left by creating a new position
-                new_pos = (tile.pos[0] - self.end_width * len(layer_data['tiles']), tile.pos[1])
-                tile.pos = new_pos  # Update the tile's position
-                
-            old_pos = tile_pos
-
-            # Check for gaps on the right
-            while tile_pos < WINDOW_WIDTH:
-                new_tile_pos = tile_pos + tile.size[0]
-                self.display_surface.blit(tile.draw_image, (new_tile_pos, y_offset))
-                tile_pos = new_tile_pos
-
-            # Check for gaps on the left
-            while old_pos >= 0:
-                new_tile_pos = old_pos - tile.size[0]
-                self.display_surface.blit(tile.draw_image, (new_tile_pos, y_offset))
-                old_pos = new_tile_pos
-                
+        x = layer_data['vector'].x * layer_data['delay']
+        layer_data['strip'].draw(self.render_queue, x, layer_data['vector'].y)
+
     def _setup_foreground_layers(self):
         """Initialize foreground layers for parallax effect"""
         self.foreground_layers = {
@@ -272,50 +191,31 @@ class Level:
 
     def initialize_foreground_tiles(self):
         """Initialize foreground layer tiles"""
-        # Use existing tiles from canvas_data
+        # Use existing tiles from canvas_data, a layer repeats as a whole every scene width per tile
         for layer in range(13, 15):
             for canvas in self.canvas_data[layer].values():
                 self.foreground_layers[layer]['tiles'].append(canvas)
-                
+
+            period = self.end_width * len(self.foreground_layers[layer]['tiles'])
+            self.foreground_layers[layer]['strip'] = ParallaxStrip(
+                self.foreground_layers[layer]['tiles'], period if period > 0 else math.inf
+            )
+
     def _update_foreground_layer(self, layer_data):
         """Update the foreground layer position for parallax effect"""
         layer_data['vector'].x = self.origin.x * layer_data['delay']
         layer_data['vector'].y = self.origin.y - (self.origin.y * (layer_data['delay'] * 0.7)) + 60
 
-    def display_foreground_layers(self, index):
+    def display_foreground_layers(self):
         """Render foreground layers with parallax effect"""
         for layer_data in self.foreground_layers.values():
             self._update_foreground_layer(layer_data)  # Update position based on delay
-            self._render_foreground_layer(layer_data, index)
+            self._render_foreground_layer(layer_data)
+        self.render_queue.flush()
 
-    def _render_foreground_layer(self, layer_data, index):
+    def _render_foreground_layer(self, layer_data):
         """Render a specific foreground layer"""
-        # Render tiles
-        for tile in layer_data['tiles']:
-            # Calculate the position for the tile
-            y_offset = layer_data['vector'].y + tile.pos[1]
-            tile_pos = tile.pos[0] + layer_data['vector'].x
-
-            # Update animation if available
-            if tile.animation is not None:
-                tile.animation_update(index)  # Update animation frame
-                
-            # Check for off-screen positioning
-            if tile_pos < -tile.size[0] or tile_pos > WINDOW_WIDTH:
-                continue  # Do not render tile if it is off-screen
-            
-            # Render the tile
-            self.display_surface.blit(tile.draw_image, (tile_pos, y_offset))
-
-        # Handle infinite scrolling for foreground layers
-        for tile in layer_data['tiles']:
-            tile_pos = tile.pos[0] + layer_data['vector'].x
-            if tile_pos < -tile.size[0]:
-                # Move tile to the right
-                tile.pos = (tile.pos[0] + self.end_width * len(layer_data['tiles']), tile.pos[1])
-            elif tile_pos > WINDOW_WIDTH:
-                # Move tile to the left
-                tile.pos = (tile.pos[0] - self.end_width * len(layer_data['tiles']), tile.pos[1])
+        layer_data['strip'].draw(self.render_queue, layer_data['vector'].x, layer_data['vector'].y)
 
     # import
     def import_scene(self):
@@ -329,6 +229,20 @@ class Level:
         # Apply visual and gameplay settings
         self._apply_scene_settings(settings_data)
 
+        # Spatial index for the tile layers and the colliders
+        self._build_chunk_grids()
+        self.collision_world = CollisionWorld(self.tile_size, self.collider_data.values())
+
+    def _build_chunk_grids(self):
+        """Sort the tiles of the drawn layers into chunk grids"""
+        chunk_size = CHUNK_SIZE * self.tile_size
+        self.chunk_grids = {layer: ChunkGrid(chunk_size) for layer in range(4, 13)}
+        self.chunk_cache.clear()
+
+        for layer, grid in self.chunk_grids.items():
+            for canvas in self.canvas_data[layer].values():
+                grid.add(canvas)
+
     def _apply_scene_settings(self, settings):
         """Apply imported scene settings"""
         self.tile_size = settings['tile_size']
@@ -337,6 +251,7 @@ class Level:
         self.sky_color = settings['sky_color']
         self.horizon_color = settings['horizon_color']
         self.horizon_top_color = settings['horizon_top_color']
+        self.sky_gradient = settings.get('sky_gradient')
 
     def set_player_coords(self):
         """Find and set initial player coordinates"""
@@ -344,6 +259,7 @@ class Level:
             if canvas.player:
                 self._set_origin_from_canvas(canvas)
                 del self.canvas_data[9][cell]
+                self.chunk_grids[9].remove(canvas)
                 break
             
     def get_scene_width(self):
@@ -376,27 +292,38 @@ class Level:
         """Convert local coordina screen coordinates"""
         return pos[0] + self.origin.x, pos[1] + self.origin.y
 
-    def draw_layers(self, index):
+    def draw_layers(self):
         """Draw all game layers with proper ordering"""
         # Update animation state
 
         # Draw each layer
         for layer in range(4, 13):
-            self._draw_layer_contents(layer, index)
+            self._draw_layer_contents(layer)
             
             # Draw player on specific layer
             if layer == 10:
-                self.player.draw(self.display_surface, self.origin, self.start_width, self.end_width)
+                self.player.draw(self.render_queue, self.origin, self.start_width, self.end_width)
 
-    def _draw_layer_contents(self, layer, index):
-        """Draw all objects in the specified layer"""
-        for canvas in self.canvas_data[layer].values():
-            pos = self.get_free_pos_coordinates(canvas.pos)
-            
-            # Check visibility before drawing
-            if self._is_object_visible(pos, canvas.size):
-                canvas.animation_update(index)
-                self.display_surface.blit(canvas.draw_image, pos)
+    def get_viewport(self):
+        """Get the visible area in level coordinates, the window's view at any render size"""
+        return pygame.Rect(-self.origin.x, -self.origin.y, WINDOW_WIDTH, WINDOW_HEIGHT)
+
+    def _draw_layer_contents(self, layer):
+        """Draw the baked static tiles of the chunks on screen, then their animated tiles"""
+        for key, chunk in self.chunk_grids[layer].query(self.get_viewport()):
+            baked = self.chunk_cache.get((layer, key), chunk)
+            if baked.surface:
+                self.render_queue.add(baked.surface, self.get_free_pos_coordinates(baked.pos),
+                                      pygame.BLEND_PREMULTIPLIED)
+
+            for canvas in baked.animated:
+                pos = self.get_free_pos_coordinates(canvas.pos)
+
+                # Check visibility before drawing
+                if self._is_object_visible(pos, canvas.size):
+                    self.render_queue.add(canvas.draw_image, pos, dirty=True)
+
+        self.render_queue.flush()
 
     @staticmethod
     def _is_object_visible(pos, size):
@@ -412,19 +339,36 @@ class Level:
         self.origin.x = coords[0]
         self.origin.y = coords[1]
         
+        self.chunk_cache.next_frame()
+
         # Draw all elements in proper order
         self.animation_index += self.animation_speed * dt
-        index = int(self.animation_index)
+        self.animations.update(int(self.animation_index))
+
         # Draw background layers
-        self.display_sky()
-        self.display_clouds(index)
-        self.display_background_layers(index)
-        
+        with self.profiler.stage('camera.sky'):
+            self.display_sky()
+        with self.profiler.stage('camera.clouds'):
+            self.display_clouds()
+        with self.profiler.stage('camera.background'):
+            self.display_background_layers()
+
         # Draw layers
-        self.draw_layers(index)
-        
+        with self.profiler.stage('camera.layers'):
+            self.draw_layers()
+
         # Draw foreground
-        self.display_foreground_layers(index)
+        with self.profiler.stage('camera.foreground'):
+            self.display_foreground_layers()
+
+        self._check_view_moved()
+
+    def _check_view_moved(self):
+        """Request a full display update when the camera or the horizon moved"""
+        view = (self.origin.x, self.origin.y, self.horizon_y)
+        if view != self.last_view:
+            self.dirty_rects.full()
+            self.last_view = view
 
 
 class Collider:
@@ -483,7 +427,7 @@ class Collider:
 class TileObject:
     """Represents a tile object in the game world"""
     
-    def __init__(self, layer=10, image=None, pos=None, animation=None):
+    def __init__(self, layer=10, image=None, pos=None, animation=None, region=None):
         """Initialize tile object with position and visual properties"""
         self.pos = pos
         self.layer = layer  # Layer range: 3 - 14
@@ -493,9 +437,12 @@ class TileObject:
 
         # Visual properties
         self.animation = animation
-        self.image = image
+        self.clip = get_animation_registry().get(animation)  # Shared by every tile with this animation
+        self.region = region  # Atlas region the image is drawn from
+        self.image = region.surface if region else image
         self.size = None
-        self.draw_image = self.image.copy() if image else None
+
+        self.static_image = self.image  # Shared with every tile of the same image
 
     def _initialize_flags(self):
         """Initialize object type flags"""
@@ -506,8 +453,7 @@ class TileObject:
         self.event = False
         self.id = None
 
-    def animation_update(self, index):
-        """Update object animation if available"""
-        if self.animation:
-            index %= len(self.animation)
-            self.draw_image = self.animation[index]
+    @property
+    def draw_image(self):
+        """Current animation frame, or the tile image if the tile does not animate"""
+        return self.clip.frame if self.clip else self.static_image
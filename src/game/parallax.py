@@ -0,0 +1,149 @@
+"""
+Wrapping parallax strips
+
+The tiles of an endless parallax layer are baked once into a strip that
+repeats horizontally. Drawing a layer is then a modulo of its scroll
+position and at most a couple of blits, instead of blitting every tile again
+until the screen is covered.
+"""
+import math
+
+import pygame
+
+from src.game.chunks import bake_premultiplied
+from src.settings import WINDOW_WIDTH, PARALLAX_STRIP_MAX_WIDTH
+
+
+def get_repeat_positions(x, width, period):
+    """
+    Get the screen positions of a repeating image that overlap the screen.
+
+    Args:
+        x (float): The position of one copy.
+        width (int): The width of the image.
+        period (float): The distance between copies, math.inf for a single copy.
+
+    Yields:
+        float: The x position of every visible copy, left to right.
+    """
+    if math.isinf(period):
+        if -width < x < WINDOW_WIDTH:
+            yield x
+        return
+
+    # Leftmost copy that reaches onto the screen, on whole pixels so copies line up without seams
+    x = math.floor(x)
+    x -= period * math.floor((x + width) / period)
+    while x < WINDOW_WIDTH:
+        yield x
+        x += period
+
+
+class ParallaxStrip:
+    """The tiles of a parallax layer baked into one horizontally repeating surface"""
+
+    def __init__(self, tiles, period=None):
+        """
+        Bake the static tiles of a layer.
+
+        Args:
+            tiles (list): The tiles of the layer in drawing order.
+            period (float): The distance after which the whole layer repeats, math.inf if it does not.
+                None repeats every tile right next to itself, like the background layers.
+        """
+        self.tiles = [tile for tile in tiles if tile.draw_image]
+        self.surface = None
+        self.owns_surface = False
+        self.pos = (0, 0)  # Position of the strip relative to the layer
+        self.width = 0
+        self.period = period
+        self.repeat_tiles = period is None
+
+        if self.repeat_tiles:
+            self.period = math.lcm(*(tile.draw_image.get_width() for tile in self.tiles)) if self.tiles else 0
+            # Without a common period that fits in a strip, tiles are drawn one by one
+            if self.period > PARALLAX_STRIP_MAX_WIDTH:
+                self.loose = self.tiles
+                return
+            self.loose = [tile for tile in self.tiles if tile.animation]
+            self._bake_tiled([tile for tile in self.tiles if not tile.animation])
+        else:
+            self.loose = [tile for tile in self.tiles if tile.animation]
+            self._bake_bounds([tile for tile in self.tiles if not tile.animation])
+
+    def _bake_tiled(self, static):
+        """Bake tiles that each repeat next to themselves into a strip at least as wide as the screen"""
+        if not static:
+            return
+
+        top = min(tile.pos[1] for tile in static)
+        bottom = max(tile.pos[1] + tile.draw_image.get_height() for tile in static)
+
+        # A single tile as wide as the screen already is its own strip
+        if len(static) == 1 and self.period >= WINDOW_WIDTH:
+            tile = static[0]
+            self.surface = tile.draw_image
+            self.pos = tile.pos
+            self.width = self.period
+            return
+
+        self.width = self.period * math.ceil(WINDOW_WIDTH / self.period)
+        self.pos = (0, top)
+        blits = []
+        for tile in static:
+            image = tile.draw_image
+            for x in range(int(tile.pos[0]) % image.get_width() - image.get_width(), self.width, image.get_width()):
+                blits.append((image, (x, tile.pos[1] - top)))
+
+        self.surface = bake_premultiplied((self.width, bottom - top), blits)
+        self.owns_surface = True
+        self.period = self.width
+
+    def _bake_bounds(self, static):
+        """Bake tiles that repeat as a group into a strip trimmed to the area they cover"""
+        if not static:
+            return
+
+        rects = [tile.draw_image.get_rect(topleft=tile.pos) for tile in static]
+        bounds = rects[0].unionall(rects[1:])
+
+        # A single tile is its own strip
+        if len(static) == 1:
+            self.surface = static[0].draw_image
+        else:
+            self.surface = bake_premultiplied(
+                bounds.size,
+                [(tile.draw_image, rect.move(-bounds.x, -bounds.y)) for tile, rect in zip(static, rects)]
+            )
+            self.owns_surface = True
+
+        self.pos = bounds.topleft
+        self.width = bounds.width
+
+    @property
+    def nbytes(self):
+        """Memory used by a baked strip, a strip that is a tile image costs nothing extra"""
+        if not self.owns_surface:
+            return 0
+        return self.surface.get_width() * self.surface.get_height() * self.surface.get_bytesize()
+
+    def draw(self, render_queue, x, y):
+        """
+        Queue the visible copies of the layer.
+
+        Args:
+            render_queue (RenderQueue): The queue to draw with.
+            x (float): The horizontal scroll position of the layer.
+            y (float): The vertical position of the layer.
+        """
+        if self.surface:
+            flags = pygame.BLEND_PREMULTIPLIED if self.owns_surface else 0
+            for copy_x in get_repeat_positions(self.pos[0] + x, self.width, self.period):
+                render_queue.add(self.surface, (copy_x, self.pos[1] + y), flags)
+
+        # Animated tiles change every frame and are drawn on top of the strip
+        for tile in self.loose:
+            width = tile.draw_image.get_width()
+            period = width if self.repeat_tiles else self.period
+            for copy_x in get_repeat_positions(tile.pos[0] + x, width, period):
+                render_queue.add(tile.draw_image, (copy_x, tile.pos[1] + y), dirty=tile.animation is not None)
@@ -1,9 +1,12 @@
 import pygame
+import math
 import sys
 import os
 from src.utils import resource_path
 from pygame.math import Vector2
-from src.settings import PLAYER_PATH, PLAYER_ANIMATION_SPEED, PLAYER_IMAGE_WIDTH, PLAYER_IMAGE_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_IMAGE_INDENT
+from src.game.collision import CollisionWorld
+from src.render_queue import RenderQueue
+from src.settings import PLAYER_PATH, PLAYER_ANIMATION_SPEED, PLAYER_IMAGE_WIDTH, PLAYER_IMAGE_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT, PLAYER_IMAGE_INDENT, PHYSICS_REFERENCE_RATE
 
 
 class Player:
@@ -14,7 +17,13 @@ class Player:
         # Physical properties
         self.origin = Vector2(0, 0)
         self.rect = pygame.Rect(0, 0, PLAYER_WIDTH, PLAYER_HEIGHT)
+        self.pos = Vector2(self.rect.topleft)  # Exact position, the rect is the pixel it falls in
         self.direction = Vector2(0, 0)
+
+        # Fixed timestep, the position of the previous tick and the position drawn between the two
+        self.previous_pos = Vector2(self.pos)
+        self.draw_pos = Vector2(self.rect.topleft)
+        self.time_scale = 1.0  # Length of the current tick in PHYSICS_REFERENCE_RATE ticks
         
         # Movement parameters
         self.normal_animation_speed = PLAYER_ANIMATION_SPEED
@@ -92,11 +101,19 @@ class Player:
     def set_coords(self, origin: Vector2) -> None:
         """Set player position relative to origin point"""
         self.rect = self.rect.move(origin.x, origin.y)
+        self.pos.update(self.rect.topleft)
+        self.previous_pos.update(self.pos)
+        self.draw_pos.update(self.rect.topleft)
+
+    def interpolate(self, alpha: float) -> None:
+        """Place the drawn player between the previous and the current tick"""
+        x, y = self.previous_pos.lerp(self.pos, alpha)
+        self.draw_pos.update(round(x), round(y))
 
-    def event_loop(self) -> None:
-        """Handle player input events"""
+    def event_loop(self, keys=None) -> None:
+        """Handle player input events, keys replaces the keyboard state for scripted input"""
         self._handle_quit_event()
-        self._handle_movement_input()
+        self._handle_movement_input(keys)
 
     @staticmethod
     def _handle_quit_event() -> None:
@@ -106,9 +123,10 @@ class Player:
                 pygame.quit()
                 sys.exit()
 
-    def _handle_movement_input(self) -> None:
+    def _handle_movement_input(self, keys=None) -> None:
         """Process keyboard input for player movement"""
-        keys = pygame.key.get_pressed()
+        if keys is None:
+            keys = pygame.key.get_pressed()
 
         # Reset horizontal velocity
         self.direction.x = 0
@@ -206,8 +224,32 @@ class Player:
             
             self.animation_key = 'attack_right' if self.last_direction == 'run_right' else 'attack_left'  # Set attack animation
 
-    def update(self, colliders: list, dt: float) -> None:
-        """Update player physics and handle collisions"""
+    def update(self, colliders: CollisionWorld, dt: float) -> None:
+        """Advance player physics and handle collisions by one simulation tick of dt seconds"""
+        if self.rect.topleft != self._get_pixel(self.pos):
+            self.pos.update(self.rect.topleft)  # The rect was placed from outside
+        self.previous_pos.update(self.pos)
+
+        # A tick that would move the player more than a tile is split into substeps
+        steps = self._get_substeps(colliders.tile_size, dt)
+        for _ in range(steps):
+            self._step(colliders, dt / steps)
+
+    @staticmethod
+    def _get_pixel(pos: Vector2) -> tuple[int, int]:
+        """Get the pixel a position falls in"""
+        return math.floor(pos.x), math.floor(pos.y)
+
+    def _get_substeps(self, tile_size: int, dt: float) -> int:
+        """Get the number of substeps that keep the movement of every step within a tile"""
+        slide_speed = self.current_slide_speed * 1.5 if self.is_sliding else 0
+        speed = max(abs(self.direction.x), abs(slide_speed), abs(self.direction.y) + 2 * self.gravity)
+        return max(1, math.ceil(speed * dt * PHYSICS_REFERENCE_RATE / tile_size))
+
+    def _step(self, colliders: CollisionWorld, dt: float) -> None:
+        """Advance player physics and handle collisions by dt seconds"""
+        self.time_scale = dt * PHYSICS_REFERENCE_RATE
+
         if self.is_attacking:
             self.attack_timer -= dt  # Decrease the attack timer
             if self.attack_timer <= 0:
@@ -230,21 +272,22 @@ class Player:
 
         self._apply_gravity()
         self._handle_collisions(colliders)
-        self._update_position()
+        self._update_position(colliders)
         self._update_animation(dt)
 
     def _apply_gravity(self) -> None:
         """Apply gravity to vertical movement"""
-        self.direction.y = min(self.direction.y + self.gravity, self.terminal_velocity)
+        self.direction.y = min(self.direction.y + self.gravity * self.time_scale, self.terminal_velocity)
 
-    def _update_position(self) -> None:
-        """Update player position based on velocity"""
+    def _update_position(self, colliders: CollisionWorld) -> None:
+        """Update player position based on velocity, without passing through collider edges"""
+        x, y = self.pos
         if self.is_sliding and -1 < self.direction.y < 1 and not self.right_barrier and not self.left_barrier:
             # Calculate new position based on current sliding speed
             if self.last_direction in ('run_right', 'walk_right'):
-                new_x = self.rect.x + self.current_slide_speed * 1.5
+                new_x = x + self.current_slide_speed * 1.5 * self.time_scale
             else:
-                new_x = self.rect.x - self.current_slide_speed * 1.5
+                new_x = x - self.current_slide_speed * 1.5 * self.time_scale
 
             # Check boundaries
             if new_x < self.start_width:
@@ -254,34 +297,42 @@ class Player:
                 new_x = self.end_width - self.rect.width  # Prevent going beyond the right boundary
                 self.is_sliding = False  # Stop sliding if hitting the boundary
 
-            self.rect.x = new_x  # Update the player's position
+            x = new_x  # Update the player's position
         else:
             if self.is_sliding:
                 self.is_sliding = False  # Stop sliding
-            self.rect.x += self.direction.x
-            self.rect.y += self.direction.y
-
-    def _handle_collisions(self, colliders: list) -> None:
-        """Handle collisions with level geometry"""
-        for collider in colliders:
+            x += self.direction.x * self.time_scale
+            y += self.direction.y * self.time_scale
+
+        # The sweep works in pixels, an axis it stops on continues from the edge
+        target = self.rect.copy()
+        target.topleft = self._get_pixel(Vector2(x, y))
+        moved = colliders.sweep(self.rect, target)
+        self.pos.update(x if moved.x == target.x else moved.x, y if moved.y == target.y else moved.y)
+        self.rect.topleft = moved.topleft
+
+    def _handle_collisions(self, colliders: CollisionWorld) -> None:
+        """Handle collisions with the level geometry around the player"""
+        self.left_barrier = False
+        self.right_barrier = False
+
+        for collider in colliders.query(self.rect):
             left, right, up, down = collider.check_collision(self.rect)
             
-            # Horizontal collisions
+            # Horizontal collisions, a barrier is kept for the frame once any collider hits it
             if left:
                 self.rect.left = collider.pos[0]
+                self.pos.x = self.rect.x
                 self.left_barrier = True
                 if self.is_sliding:
                     self.is_sliding = False  # Stop sliding on collision
-            else:
-                self.left_barrier = False
             
             if right:
                 self.rect.right = collider.pos[0] + collider.size
+                self.pos.x = self.rect.x
                 self.right_barrier = True
                 if self.is_sliding:
                     self.is_sliding = False  # Stop sliding on collision
-            else:
-                self.right_barrier = False
             
             # Vertical collisions
             if up:  # Only handle upward collisions if falling
@@ -290,13 +341,14 @@ class Player:
             if down and self.rect.bottom <= collider.pos[1] + PLAYER_HEIGHT and self.direction.y >= 0:  # Check if falling onto the collider
                 if self.rect.bottom < collider.pos[1] + PLAYER_HEIGHT:
                     self.rect.bottom = collider.pos[1] + collider.size  # Snap to the bottom of the collider
+                self.pos.y = self.rect.y  # Rest on the edge without a fraction sinking into it
                 self.direction.y = 0.001  # Stop upward movement
                 self.on_ground = True  # Set on_ground to True when landing
                 self.is_jumping = False  # Reset jumping state when landing
 
         # Apply gravity if not on ground
         if not self.on_ground:
-            self.direction.y += self.gravity
+            self.direction.y += self.gravity * self.time_scale
 
     def _update_animation(self, dt: float) -> None:
         """Update the current frame of the animation"""
@@ -334,11 +386,12 @@ class Player:
         # Update the image based on direction
         self.image = self.animation_frames[self.animation_key][self.current_frame % len(self.animation_frames[self.animation_key])]
         
-    def draw(self, screen: pygame.Surface, origin: Vector2, start_width: int, end_width: int) -> None:
+    def draw(self, render_queue: RenderQueue, origin: Vector2, start_width: int, end_width: int) -> None:
         """Draw player on screen relative to origin point"""
         self.start_width = start_width
         self.end_width = end_width
         
-        draw_rect = self.rect.move(origin.x - PLAYER_IMAGE_INDENT, origin.y)
+        draw_rect = pygame.Rect(self.draw_pos, self.rect.size).move(origin.x - PLAYER_IMAGE_INDENT, origin.y)
         self.origin = origin
-        screen.blit(self.image, draw_rect)  # Draw the current player image
+        render_queue.add(self.image, draw_rect.topleft, dirty=True)  # Draw the current player image
+        render_queue.flush()
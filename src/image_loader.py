@@ -0,0 +1,127 @@
+"""
+Parallel image decoding for scene loading
+
+The loader first collects the unique image files and animation frames a
+scene uses, decodes them in a thread pool and only runs convert_alpha on the
+main thread. pygame releases the GIL while SDL_image decodes a file, so the
+decoding scales with the number of cores without the start-up and pickling
+cost of worker processes.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from glob import glob
+
+import pygame
+
+from src.settings import IMAGE_LOADER_WORKERS
+from src.utils import resource_path
+
+ERROR_IMAGE_PATH: str = resource_path('assets/graphics/texture_error/error.png')
+
+
+def normalize_path(path):
+    """Use the native separator for paths saved on another platform"""
+    return os.path.normpath(path.replace('\\', '/'))
+
+
+class ImageLoader:
+    """Decodes the images of a scene in a worker pool"""
+
+    def __init__(self, workers=IMAGE_LOADER_WORKERS):
+        """
+        Initialize the loader.
+
+        Args:
+            workers (int): The number of decoding threads.
+        """
+        self.workers = max(1, workers)
+        self._error_image = None
+
+    @staticmethod
+    def _decode(path):
+        """
+        Decode an image file in a worker thread.
+
+        Args:
+            path (str): The path to the image.
+
+        Returns:
+            pygame.Surface: The decoded pixels in the file's own format, None if the file cannot be read.
+        """
+        try:
+            return pygame.image.load(normalize_path(path))
+        except (pygame.error, FileNotFoundError):
+            return None
+
+    @staticmethod
+    def get_animation_files(animation_path):
+        """
+        Get the frame files of an animation folder in playback order.
+
+        Args:
+            animation_path (str): The path to the animation folder.
+
+        Returns:
+            list: The paths to the frames.
+        """
+        return sorted(glob(os.path.join(normalize_path(animation_path), '*.png')))
+
+    def get_error_image(self):
+        """Get the placeholder shown for images that failed to load"""
+        if self._error_image is None:
+            self._error_image = pygame.image.load(ERROR_IMAGE_PATH).convert_alpha()
+        return self._error_image
+
+    def decode_all(self, paths):
+        """
+        Decode image files in the worker pool.
+
+        Args:
+            paths (iterable): The paths to the images, duplicates are decoded once.
+
+        Returns:
+            dict: The decoded, not yet converted surfaces by path.
+        """
+        paths = list(dict.fromkeys(paths))
+        if self.workers == 1 or len(paths) < 2:
+            return {path: self._decode(path) for path in paths}
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(paths))) as executor:
+            return dict(zip(paths, executor.map(self._decode, paths)))
+
+    def load(self, image_paths, animation_paths=(), preloaded=None):
+        """
+        Load the images and animations used by a scene.
+
+        Args:
+            image_paths (iterable): The image path of every object, may contain duplicates and None.
+            animation_paths (iterable): The animation folder of every object, may contain duplicates and None.
+            preloaded (dict): Surfaces by image path that need no decoding, e.g. atlas regions.
+
+        Returns:
+            tuple: Converted surfaces by image path and frame tuples by animation path.
+        """
+        preloaded = preloaded or {}
+        image_paths = [path for path in dict.fromkeys(image_paths) if path and path not in preloaded]
+        animation_files = {
+            path: self.get_animation_files(path)
+            for path in dict.fromkeys(animation_paths)
+            if path
+        }
+
+        frame_paths = [file for files in animation_files.values() for file in files]
+        decoded = self.decode_all(image_paths + frame_paths)
+
+        # Converting to the display format has to happen on the main thread
+        converted = {
+            path: surface.convert_alpha() if surface is not None else self.get_error_image()
+            for path, surface in decoded.items()
+        }
+
+        images = dict(preloaded)
+        images.update((path, converted[path]) for path in image_paths)
+        animations = {
+            path: tuple(converted[file] for file in files)
+            for path, files in animation_files.items()
+        }
+        return images, animations
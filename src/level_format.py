@@ -0,0 +1,203 @@
+"""
+Compiled binary level format
+
+The editor keeps tiles.csv/colliders.csv as the authoring format and writes
+level.bin next to them, which the game loads without any CSV parsing.
+
+File layout (little-endian):
+    header     magic, format version, tile count, collider count, string count
+    strings    interned image/animation paths, ids and collider types
+               (u16 byte length + UTF-8 bytes each)
+    tiles      fixed-width TILE_RECORD entries
+    colliders  fixed-width COLLIDER_RECORD entries
+
+Strings are referenced by their index in the string table, -1 means "no value".
+"""
+import os
+import struct
+import sys
+
+COMPILED_LEVEL_NAME: str = 'level.bin'
+FORMAT_MAGIC: bytes = b'A80L'
+FORMAT_VERSION: int = 1
+
+HEADER = struct.Struct('<4sHIII')
+STRING_LENGTH = struct.Struct('<H')
+# layer, flags, x, y, width, height, image, animation, id
+TILE_RECORD = struct.Struct('<BBddHHiii')
+# x, y, image, collider type
+COLLIDER_RECORD = struct.Struct('<ddii')
+
+# Bit positions of the tile flags, in the order of the tiles.csv columns
+TILE_FLAGS = ('is_item', 'is_npc', 'is_enemy', 'is_player', 'is_event')
+
+
+class StringTable:
+    """Interns strings so that every distinct path is stored only once"""
+
+    def __init__(self):
+        self.strings = []
+        self.indexes = {}
+
+    def add(self, value):
+        """Return the index of value in the table, -1 for empty values"""
+        if not value or not isinstance(value, str):
+            return -1
+
+        index = self.indexes.get(value)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(value)
+            self.indexes[value] = index
+        return index
+
+
+def write_level(path, tile_columns, collider_columns):
+    """
+    Write a compiled level file.
+
+    Args:
+        path (str): The path to the level.bin file.
+        tile_columns (dict): Tile data by tiles.csv column, coords and size as tuples.
+        collider_columns (dict): Collider data by colliders.csv column, coords as tuples.
+    """
+    strings = StringTable()
+    tile_records = []
+    collider_records = []
+
+    for i, layer in enumerate(tile_columns['layer']):
+        flags = 0
+        for bit, name in enumerate(TILE_FLAGS):
+            if tile_columns[name][i]:
+                flags |= 1 << bit
+
+        x, y = tile_columns['coords'][i]
+        width, height = tile_columns['size'][i]
+        tile_records.append(TILE_RECORD.pack(
+            int(layer), flags, x, y, width, height,
+            strings.add(tile_columns['image_path'][i]),
+            strings.add(tile_columns['animation_path'][i]),
+            strings.add(tile_columns['id'][i])
+        ))
+
+    for i, (x, y) in enumerate(collider_columns['coords']):
+        collider_records.append(COLLIDER_RECORD.pack(
+            x, y,
+            strings.add(collider_columns['image_path'][i]),
+            strings.add(collider_columns['collider_type'][i])
+        ))
+
+    chunks = [HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, len(tile_records), len(collider_records), len(strings.strings))]
+    for value in strings.strings:
+        encoded = value.encode('utf-8')
+        chunks.append(STRING_LENGTH.pack(len(encoded)))
+        chunks.append(encoded)
+    chunks.extend(tile_records)
+    chunks.extend(collider_records)
+
+    # Write next to the target first so a crash never leaves a truncated level behind
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(b''.join(chunks))
+    os.replace(tmp_path, path)
+
+
+def read_level(path):
+    """
+    Read a compiled level file.
+
+    Args:
+        path (str): The path to the level.bin file.
+
+    Returns:
+        tuple: Tile columns and collider columns in the same shape write_level accepts.
+
+    Raises:
+        ValueError: If the file is not a compiled level or has another format version.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+
+    magic, version, tile_count, collider_count, string_count = HEADER.unpack_from(data, 0)
+    if magic != FORMAT_MAGIC:
+        raise ValueError(f'{path} is not a compiled level')
+    if version != FORMAT_VERSION:
+        raise ValueError(f'{path} has format version {version}, expected {FORMAT_VERSION}')
+
+    offset = HEADER.size
+    strings = []
+    for _ in range(string_count):
+        (length,) = STRING_LENGTH.unpack_from(data, offset)
+        offset += STRING_LENGTH.size
+        strings.append(data[offset:offset + length].decode('utf-8'))
+        offset += length
+
+    # Index -1 resolves to None through the trailing sentinel
+    strings.append(None)
+
+    tiles_end = offset + tile_count * TILE_RECORD.size
+    tile_records = list(TILE_RECORD.iter_unpack(data[offset:tiles_end]))
+    collider_records = list(COLLIDER_RECORD.iter_unpack(data[tiles_end:tiles_end + collider_count * COLLIDER_RECORD.size]))
+
+    tile_columns = {
+        'layer': [record[0] for record in tile_records],
+        'coords': [(record[2], record[3]) for record in tile_records],
+        'image_path': [strings[record[6]] for record in tile_records],
+        'animation_path': [strings[record[7]] for record in tile_records],
+        'id': [strings[record[8]] for record in tile_records],
+        'size': [(record[4], record[5]) for record in tile_records],
+    }
+    for bit, name in enumerate(TILE_FLAGS):
+        tile_columns[name] = [bool(record[1] >> bit & 1) for record in tile_records]
+
+    collider_columns = {
+        'coords': [(record[0], record[1]) for record in collider_records],
+        'image_path': [strings[record[2]] for record in collider_records],
+        'collider_type': [strings[record[3]] for record in collider_records],
+    }
+
+    return tile_columns, collider_columns
+
+
+def is_level_fresh(scene_path):
+    """
+    Check that a scene has a compiled level that is not older than its CSV files.
+
+    Args:
+        scene_path (str): The scene directory.
+
+    Returns:
+        bool: True if level.bin exists and can be used instead of the CSV files.
+    """
+    compiled_path = os.path.join(scene_path, COMPILED_LEVEL_NAME)
+    if not os.path.exists(compiled_path):
+        return False
+
+    compiled_mtime = os.path.getmtime(compiled_path)
+    for name in ('tiles.csv', 'colliders.csv'):
+        source_path = os.path.join(scene_path, name)
+        if os.path.exists(source_path) and os.path.getmtime(source_path) > compiled_mtime:
+            return False
+    return True
+
+
+def compile_scene(scene_path):
+    """
+    Compile the CSV files of a scene into level.bin.
+
+    Args:
+        scene_path (str): The scene directory.
+    """
+    from src.save_manager import SaveManager
+
+    save_manager = SaveManager(None, None, False)
+    tile_columns = save_manager.read_tile_columns(os.path.join(scene_path, 'tiles.csv'))
+    collider_columns = save_manager.read_collider_columns(os.path.join(scene_path, 'colliders.csv'))
+    write_level(os.path.join(scene_path, COMPILED_LEVEL_NAME), tile_columns, collider_columns)
+
+
+if __name__ == '__main__':
+    # Usage: python -m src.level_format <scene directory> [<scene directory> ...]
+    for scene in sys.argv[1:]:
+        compile_scene(scene)
+        print(f'Compiled {os.path.join(scene, COMPILED_LEVEL_NAME)}')
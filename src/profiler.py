@@ -0,0 +1,312 @@
+"""
+Frame time profiler
+
+Stages of a frame are timed with `with get_profiler().stage(name):` blocks.
+The profiler keeps a rolling window of samples per stage for the on-screen
+overlay, toggled with PROFILER_OVERLAY_KEY, and a fixed size histogram of
+the whole session for the JSON and CSV reports it writes on exit, so memory
+does not grow however long the game runs. While PROFILER_ENABLED is
+off a stage is a shared no-op context, so instrumented code costs one method
+call per stage.
+"""
+import atexit
+import csv
+import json
+import math
+import os
+import time
+from array import array
+from collections import deque
+
+import numpy as np
+import pygame
+
+from src.settings import (
+    PROFILER_ENABLED, PROFILER_WINDOW, PROFILER_OVERLAY_KEY, PROFILER_OVERLAY_INTERVAL, PROFILER_OUTPUT_DIR
+)
+from src.backend import get_backend
+from src.utils import resource_path
+
+PERCENTILES: tuple = (50, 95, 99)
+
+# Session histogram bins, log spaced so every bin is HISTOGRAM_STEP wider than the one before it.
+# Percentiles of the reports are accurate to half a bin, durations outside the range land in the end bins
+HISTOGRAM_MIN_MS: float = 0.0001
+HISTOGRAM_MAX_MS: float = 10_000.0
+HISTOGRAM_STEP: float = 1.01
+
+
+class _NullStage:
+    """Stage of a disabled profiler"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class _Histogram:
+    """Session statistics of a stage in constant memory"""
+
+    def __init__(self):
+        self.log_step = math.log(HISTOGRAM_STEP)
+        self.bins = math.ceil(math.log(HISTOGRAM_MAX_MS / HISTOGRAM_MIN_MS) / self.log_step) + 1
+        self.counts = array('q', bytes(8 * self.bins))
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def append(self, duration):
+        """Add a duration in milliseconds"""
+        if duration > HISTOGRAM_MIN_MS:
+            index = min(int(math.log(duration / HISTOGRAM_MIN_MS) / self.log_step) + 1, self.bins - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.count += 1
+        self.total += duration
+        self.min = min(self.min, duration)
+        self.max = max(self.max, duration)
+
+    def percentile(self, percentile):
+        """
+        Estimate a percentile.
+
+        Args:
+            percentile (float): The percentile from 0 to 100.
+
+        Returns:
+            float: The geometric middle of the bin the percentile falls into, within the recorded range.
+        """
+        rank = max(1, math.ceil(self.count * percentile / 100))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        value = HISTOGRAM_MIN_MS * math.exp((index - 0.5) * self.log_step)
+        return min(max(value, self.min), self.max)
+
+    def get_stats(self):
+        """
+        Get the statistics of the session.
+
+        Returns:
+            dict: The count, mean, percentiles and max in milliseconds.
+        """
+        stats = {'count': self.count, 'mean': self.total / self.count}
+        for percentile in PERCENTILES:
+            stats[f'p{percentile}'] = self.percentile(percentile)
+        stats['max'] = self.max
+        return stats
+
+
+class _Stage:
+    """Times one stage of a frame"""
+
+    def __init__(self, samples, history):
+        self.samples = samples
+        self.history = history
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.record((time.perf_counter() - self.start) * 1000)
+        return False
+
+    def record(self, duration):
+        """Add a duration in milliseconds"""
+        self.samples.append(duration)
+        self.history.append(duration)
+
+
+class FrameProfiler:
+    """Collects the frame time of every stage"""
+
+    def __init__(self, enabled=PROFILER_ENABLED, window=PROFILER_WINDOW):
+        """
+        Initialize the profiler.
+
+        Args:
+            enabled (bool): Whether stages are timed at all.
+            window (int): The number of recent frames the overlay percentiles cover.
+        """
+        self.enabled = enabled
+        self.window = window
+        self.stages = {}  # name -> _Stage, in the order they first ran
+        self.null_stage = _NullStage()
+        self.frame_start = None
+        self.frames = 0
+
+        # Canvas size and backend of the profiled frames for the reports, the display may be gone on exit
+        self.render_size = None
+        self.render_backend = None
+
+        # Overlay
+        self.overlay_visible = False
+        self.overlay_key_down = False
+        self.overlay_image = None
+        self.font = None
+
+        if self.enabled:
+            atexit.register(self.dump)
+
+    def stage(self, name):
+        """
+        Get the timer of a stage.
+
+        Args:
+            name (str): The stage, nested stages are named 'parent.child'.
+
+        Returns:
+            _Stage: A context manager timing its block.
+        """
+        if not self.enabled:
+            return self.null_stage
+
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = _Stage(deque(maxlen=self.window), _Histogram())
+        return stage
+
+    def reset(self):
+        """Forget every sample"""
+        self.stages = {}
+        self.frame_start = None
+        self.frames = 0
+        self.overlay_image = None
+
+    def end_frame(self):
+        """Record the time of the whole frame and handle the overlay hotkey"""
+        if not self.enabled:
+            return
+
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.stage('frame').record((now - self.frame_start) * 1000)
+        self.frame_start = now
+        self.frames += 1
+
+        if self.render_size is None:
+            backend = get_backend()
+            self.render_size, self.render_backend = list(backend.target.get_size()), backend.name
+
+        key_down = pygame.key.get_pressed()[pygame.key.key_code(PROFILER_OVERLAY_KEY)]
+        if key_down and not self.overlay_key_down:
+            self.overlay_visible = not self.overlay_visible
+            self.overlay_image = None
+        self.overlay_key_down = key_down
+
+    def get_percentiles(self, recent=True):
+        """
+        Get the frame time statistics of every stage.
+
+        Args:
+            recent (bool): Only use the rolling window instead of the session histogram.
+
+        Returns:
+            dict: Stage name -> count, mean, p50, p95, p99 and max in milliseconds.
+        """
+        stats = {}
+        for name, stage in self.stages.items():
+            if not recent:
+                if stage.history.count:
+                    stats[name] = stage.history.get_stats()
+                continue
+
+            samples = np.asarray(stage.samples, dtype=float)
+            if not samples.size:
+                continue
+
+            stats[name] = {'count': int(samples.size), 'mean': float(samples.mean())}
+            for percentile, value in zip(PERCENTILES, np.percentile(samples, PERCENTILES)):
+                stats[name][f'p{percentile}'] = float(value)
+            stats[name]['max'] = float(samples.max())
+        return stats
+
+    def draw_overlay(self, surface, dirty_rects=None):
+        """
+        Draw the rolling percentiles in the top left corner while the overlay is shown.
+
+        Args:
+            surface (pygame.Surface): The surface to draw on.
+            dirty_rects (DirtyRects): The tracker to report the drawn area to.
+        """
+        if not self.enabled or not self.overlay_visible:
+            return
+
+        if self.overlay_image is None or self.frames % PROFILER_OVERLAY_INTERVAL == 0:
+            self.overlay_image = self._render_overlay()
+
+        rect = surface.blit(self.overlay_image, (4, 4))
+        if dirty_rects is not None:
+            dirty_rects.add(rect)
+
+    def _render_overlay(self):
+        """Render the statistics table into an image"""
+        if self.font is None:
+            self.font = pygame.font.Font(resource_path('assets/editor/fonts/press-start-2p-regular.ttf'), 8)
+
+        lines = [f'{"stage":<18}{"p50":>7}{"p95":>7}{"p99":>7}  ms']
+        for name, stats in self.get_percentiles().items():
+            lines.append(f'{name:<18}{stats["p50"]:7.2f}{stats["p95"]:7.2f}{stats["p99"]:7.2f}')
+
+        line_height = self.font.get_linesize()
+        images = [self.font.render(line, False, 'white') for line in lines]
+        width = max(image.get_width() for image in images) + 8
+        overlay = pygame.Surface((width, line_height * len(images) + 8))
+        overlay.fill((21, 20, 26))
+        for index, image in enumerate(images):
+            overlay.blit(image, (4, 4 + index * line_height))
+        return overlay
+
+    def dump(self, directory=PROFILER_OUTPUT_DIR):
+        """
+        Write the statistics of the whole session as JSON and CSV files.
+
+        Args:
+            directory (str): The folder for the reports, named after the time of the dump.
+
+        Returns:
+            str: The path of the reports without extension, None if nothing was recorded.
+        """
+        stats = self.get_percentiles(recent=False)
+        if not stats:
+            return None
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, time.strftime('profile-%Y%m%d-%H%M%S'))
+
+        with open(f'{path}.json', 'w', encoding='utf-8') as file:
+            json.dump({
+                'frames': self.frames,
+                'render_size': self.render_size,
+                'render_backend': self.render_backend,
+                'stages': stats
+            }, file, indent=4)
+
+        columns = ['count', 'mean'] + [f'p{percentile}' for percentile in PERCENTILES] + ['max']
+        with open(f'{path}.csv', 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(['stage'] + columns)
+            for name, values in stats.items():
+                writer.writerow([name] + [values[column] for column in columns])
+
+        return path
+
+
+_profiler = None
+
+
+def get_profiler():
+    """
+    Get the frame profiler of this process, creating it on first use.
+
+    Returns:
+        FrameProfiler: The shared profiler.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = FrameProfiler()
+    return _profiler
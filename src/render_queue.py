@@ -0,0 +1,91 @@
+"""
+Batched blitting
+
+Draw code queues (surface, position) pairs and submits them in one
+Surface.blits call instead of one blit call per tile, which keeps the
+per-call overhead of Python out of the drawing loops. Surface.fblits is used
+when the installed pygame provides it. Items are drawn in the order they were
+queued.
+
+A queue can draw onto a canvas smaller or larger than the positions it is
+given. Positions are then scaled to the canvas and every image is drawn from
+a copy scaled once, which is kept as long as the image is.
+"""
+import math
+import weakref
+
+import pygame
+
+from src.dirty_rects import get_dirty_rects
+
+
+class RenderQueue:
+    """Collects the blits of a layer and draws them in one call"""
+
+    def __init__(self, surface, scale=1):
+        """
+        Initialize an empty queue.
+
+        Args:
+            surface (pygame.Surface): The surface the queue draws onto.
+            scale (float): Surface pixels per pixel of the queued images and positions.
+        """
+        self.surface = surface
+        self.scale = scale
+        self.scaled = weakref.WeakKeyDictionary()  # pygame.Surface -> the surface scaled to the target
+        self.items = []
+        self.dirty = []  # Indexes of the items whose screen area is reported as changed
+        self.has_flags = False
+        self._fblits = getattr(surface, 'fblits', None)
+
+    def add(self, image, dest, special_flags=0, dirty=False):
+        """
+        Queue a blit.
+
+        Args:
+            image (pygame.Surface): The surface to draw.
+            dest (tuple): The position on the target surface.
+            special_flags (int): The blend mode of the blit.
+            dirty (bool): Whether to report the drawn area to the dirty rectangle tracker.
+        """
+        if self.scale != 1:
+            # Flooring keeps images that touch touching, as long as the scale turns their sizes into whole pixels
+            image = self._get_scaled(image)
+            dest = (math.floor(dest[0] * self.scale), math.floor(dest[1] * self.scale))
+
+        if dirty:
+            self.dirty.append(len(self.items))
+
+        if special_flags:
+            self.items.append((image, dest, None, special_flags))
+            self.has_flags = True
+        else:
+            self.items.append((image, dest))
+
+    def _get_scaled(self, image):
+        """Get the copy of an image scaled to the target surface, scaling it on first use"""
+        scaled = self.scaled.get(image)
+        if scaled is None:
+            width, height = image.get_size()
+            size = (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+            scaled = self.scaled[image] = pygame.transform.smoothscale(image, size)
+        return scaled
+
+    def flush(self):
+        """Draw the queued blits in order and empty the queue"""
+        if not self.items:
+            return
+
+        if self.dirty:
+            rects = self.surface.blits(self.items)
+            dirty_rects = get_dirty_rects()
+            for index in self.dirty:
+                dirty_rects.add(rects[index])
+        elif self._fblits is not None and not self.has_flags:
+            self._fblits(self.items)
+        else:
+            self.surface.blits(self.items, doreturn=False)
+
+        self.items = []
+        self.dirty = []
+        self.has_flags = False
@@ -1,14 +1,23 @@
 import pandas as pd
+import csv
 import json
 import re
 import os
 import tkinter as tk
 from tkinter import messagebox
 
-from pygame.image import load
-from glob import glob
-
 from src.editor.settings import *
+from src.asset_index import get_asset_index
+from src.atlas import AtlasLibrary
+from src.image_loader import ImageLoader
+from src.level_format import COMPILED_LEVEL_NAME, is_level_fresh, read_level, write_level
+
+# Column order of the scene CSV files
+TILE_COLUMNS = (
+    'layer', 'coords', 'image_path', 'animation_path', 'is_item', 'is_npc',
+    'is_enemy', 'is_player', 'is_event', 'id', 'size'
+)
+COLLIDER_COLUMNS = ('coords', 'image_path', 'collider_type')
 
 
 class SaveManager:
@@ -25,26 +34,9 @@ class SaveManager:
         self.collider_obj = collider_obj
         self.is_editor = is_editor
         self.tile_size = None
-
-    @staticmethod
-    def _get_files_in_directory(directory_path):
-        """
-        Get a list of files in the specified directory.
-
-        Args:
-            directory_path (str): The path to the directory.
-
-        Returns:
-            list: A list of file paths.
-        """
-        parent_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        directory_path = os.path.join(parent_path, directory_path)
-        items = os.listdir(directory_path)
-        return [
-            os.path.join(directory_path, item)
-            for item in items
-            if os.path.isfile(os.path.join(directory_path, item))
-        ]
+        self.image_loader = ImageLoader()
+        # The editor keeps standalone images
+        self.atlases = None if is_editor else AtlasLibrary()
 
     @staticmethod
     def _get_relative_path(full_path: str) -> str:
@@ -114,7 +106,8 @@ class SaveManager:
         """
         return sum(len(layer) for layer in canvas_data.values())
 
-    def _find_index_and_inner_index(self, image_path):
+    @staticmethod
+    def _find_index_and_inner_index(image_path):
         """
         Find the index and inner index of an image path.
 
@@ -124,78 +117,86 @@ class SaveManager:
         Returns:
             tuple: The index and inner index of the image.
         """
-        for index, data in EDITOR_DATA.items():
-            if data['menu_surf'] and os.path.dirname(image_path).endswith(data['menu_surf']):
-                paths = self._get_files_in_directory(data['menu_surf'])
-                if image_path in paths:
-                    inner_index = paths.index(image_path)
-                    return index, inner_index
-        return None, None
+        return get_asset_index().find(image_path)
 
-    def export_tiles(self, path, canvas_data):
+    def _get_tile_columns(self, canvas_data):
         """
-        Export the tile data to a CSV file.
+        Collect the tile data by tiles.csv column.
 
         Args:
-            path (str): The path to the CSV file.
             canvas_data (dict): The canvas data.
-        """
-        if not path or not canvas_data:
-            print("path and canvas_data cannot be None or empty.")
 
-        export_data = {
-            'layer': [],
-            'coords': [],
-            'image_path': [],
-            'animation_path': [],
-            'is_item': [],
-            'is_npc': [],
-            'is_enemy': [],
-            'is_player': [],
-            'is_event': [],
-            'id': [],
-            'size': []
-        }
+        Returns:
+            dict: The tile data, coords and size as tuples.
+        """
+        columns = {name: [] for name in TILE_COLUMNS}
 
         for layer in range(1, 15):
             for cell, canvas in canvas_data.get(layer, {}).items():
                 pos = canvas.free_pos or self._get_start_free_pos_coordinates(cell)
 
-                export_data['layer'].append(layer)
-                export_data['coords'].append(json.dumps(pos))
-                export_data['image_path'].append(self._get_relative_path(canvas.path_to_image or ''))
-                export_data['animation_path'].append(self._get_relative_path(canvas.animation_dir or ''))
-                export_data['is_item'].append(canvas.item)
-                export_data['is_npc'].append(canvas.npc)
-                export_data['is_enemy'].append(canvas.enemy)
-                export_data['is_player'].append(canvas.player)
-                export_data['is_event'].append(canvas.event)
-                export_data['id'].append(canvas.id)
-                export_data['size'].append(canvas.size)
+                columns['layer'].append(layer)
+                columns['coords'].append(tuple(pos))
+                columns['image_path'].append(self._get_relative_path(canvas.path_to_image or ''))
+                columns['animation_path'].append(self._get_relative_path(canvas.animation_dir or ''))
+                columns['is_item'].append(canvas.item)
+                columns['is_npc'].append(canvas.npc)
+                columns['is_enemy'].append(canvas.enemy)
+                columns['is_player'].append(canvas.player)
+                columns['is_event'].append(canvas.event)
+                columns['id'].append(canvas.id)
+                columns['size'].append(canvas.size)
+
+        return columns
+
+    def _get_collider_columns(self, collider_data):
+        """
+        Collect the collider data by colliders.csv column.
+
+        Args:
+            collider_data (dict): The collider data.
+
+        Returns:
+            dict: The collider data, coords as tuples.
+        """
+        columns = {name: [] for name in COLLIDER_COLUMNS}
+
+        for cell, collider in collider_data.items():
+            columns['coords'].append(self._get_start_free_pos_coordinates(cell))
+            columns['image_path'].append(self._get_relative_path(collider.path_to_image or ''))
+            columns['collider_type'].append(collider.collision_type)
+
+        return columns
+
+    def export_tiles(self, path, canvas_data, columns=None):
+        """
+        Export the tile data to a CSV file.
+
+        Args:
+            path (str): The path to the CSV file.
+            canvas_data (dict): The canvas data.
+            columns (dict): Already collected tile columns, collected from canvas_data if None.
+        """
+        if not path or not (canvas_data or columns):
+            print("path and canvas_data cannot be None or empty.")
+
+        export_data = dict(columns or self._get_tile_columns(canvas_data))
+        export_data['coords'] = [json.dumps(pos) for pos in export_data['coords']]
 
         df = pd.DataFrame(export_data)
         df.to_csv(path, index=False)
 
-    def export_colliders(self, path, collider_data):
+    def export_colliders(self, path, collider_data, columns=None):
         """
         Export the collider data to a CSV file.
 
         Args:
             path (str): The path to the CSV file.
             collider_data (dict): The collider data.
+            columns (dict): Already collected collider columns, collected from collider_data if None.
         """
-        export_data = {
-            'coords': [],
-            'image_path': [],
-            'collider_type': [],
-        }
-
-        for cell, collider in collider_data.items():
-            pos = self._get_start_free_pos_coordinates(cell)
-
-            export_data['coords'].append(json.dumps(pos))
-            export_data['image_path'].append(self._get_relative_path(collider.path_to_image or ''))
-            export_data['collider_type'].append(collider.collision_type)
+        export_data = dict(columns or self._get_collider_columns(collider_data))
+        export_data['coords'] = [json.dumps(pos) for pos in export_data['coords']]
 
         df = pd.DataFrame(export_data)
         df.to_csv(path, index=False)
@@ -216,6 +217,8 @@ class SaveManager:
             'horizon_color': HORIZON_COLOR,
             'horizon_top_color': HORIZON_TOP_COLOR
         }
+        if SKY_GRADIENT is not None:
+            export_data['sky_gradient'] = SKY_GRADIENT
 
         # Convert the data into JSON format with the required formatting
         json_str = json.dumps(export_data, indent=4, ensure_ascii=False)
@@ -227,7 +230,76 @@ class SaveManager:
         with open(path, 'w', encoding='utf-8') as json_file:
             json_file.write(json_str)
 
-    def import_tiles(self, path):  # Sourcery skip: avoid-builtin-shadow
+    @staticmethod
+    def _read_csv_columns(path):
+        """
+        Read a CSV file column by column with a streaming reader.
+
+        Args:
+            path (str): The path to the CSV file.
+
+        Returns:
+            dict: The raw string values by column name.
+        """
+        with open(path, 'r', newline='', encoding='utf-8') as file:
+            reader = csv.reader(file)
+            header = next(reader)
+            rows = list(reader)
+
+        if not rows:
+            return {name: () for name in header}
+        return dict(zip(header, zip(*rows)))
+
+    def read_tile_columns(self, path):
+        """
+        Read tile data from a CSV file without creating any objects.
+
+        Every column is parsed in bulk: all coords and sizes go through a
+        single json.loads call each instead of one call per row.
+
+        Args:
+            path (str): The path to the CSV file.
+
+        Returns:
+            dict: The tile data by column, coords and size as tuples.
+        """
+        raw = self._read_csv_columns(path)
+
+        # Sizes are written as Python tuples, turn them into JSON arrays
+        sizes = ','.join(raw['size']).replace('(', '[').replace(')', ']')
+
+        columns = {
+            'layer': list(map(int, raw['layer'])),
+            'coords': list(map(tuple, json.loads(f"[{','.join(raw['coords'])}]"))),
+            'image_path': [value or None for value in raw['image_path']],
+            'animation_path': [value or None for value in raw['animation_path']],
+            'id': [value or None for value in raw['id']],
+            'size': list(map(tuple, json.loads(f'[{sizes}]'))),
+        }
+        for name in ('is_item', 'is_npc', 'is_enemy', 'is_player', 'is_event'):
+            columns[name] = [value == 'True' for value in raw[name]]
+
+        return columns
+
+    def read_collider_columns(self, path):
+        """
+        Read collider data from a CSV file without creating any objects.
+
+        Args:
+            path (str): The path to the CSV file.
+
+        Returns:
+            dict: The collider data by column, coords as tuples.
+        """
+        raw = self._read_csv_columns(path)
+
+        return {
+            'coords': list(map(tuple, json.loads(f"[{','.join(raw['coords'])}]"))),
+            'image_path': [value or None for value in raw['image_path']],
+            'collider_type': list(raw['collider_type']),
+        }
+
+    def import_tiles(self, path):
         """
         Import tile data from a CSV file.
 
@@ -237,51 +309,69 @@ class SaveManager:
         Returns:
             dict: The imported canvas data.
         """
-        df = pd.read_csv(path)
-        image_cache = {}  # Dictionary for caching images
-        animation_cache = {}  # Dictionary for caching animations
+        return self.build_tiles(self.read_tile_columns(path))
+
+    def import_colliders(self, path):
+        """
+        Import collider data from a CSV file.
+
+        Args:
+            path (str): The path to the CSV file.
+
+        Returns:
+            dict: The imported collider data.
+        """
+        return self.build_colliders(self.read_collider_columns(path))
+
+    def _find_atlas_regions(self, image_paths):
+        """
+        Find the atlas regions of the tile graphics in a scene.
+
+        Args:
+            image_paths (iterable): The image path of every tile.
+
+        Returns:
+            dict: The atlas regions by image path, empty in the editor.
+        """
+        if self.atlases is None:
+            return {}
+        return self.atlases.find_regions(image_paths)
+
+    def build_tiles(self, columns):  # Sourcery skip: avoid-builtin-shadow
+        """
+        Create canvas objects from tile columns.
+
+        Args:
+            columns (dict): The tile data by column.
+
+        Returns:
+            dict: The canvas data.
+        """
+        # Tile graphics come from the atlas sheets, everything else is decoded up front
+        regions = self._find_atlas_regions(columns['image_path'])
+        image_cache, animation_cache = self.image_loader.load(
+            columns['image_path'], columns['animation_path'],
+            {path: region.surface for path, region in regions.items()}
+        )
         canvas_data = {i: {} for i in range(15)}
 
-        for i in range(len(df)):
-            layer = df['layer'][i]
-            coords = tuple(json.loads(df['coords'][i]))
-            image_path = df['image_path'][i]
-            animation_path = df['animation_path'][i]
-            is_item = df['is_item'][i]
-            is_npc = df['is_npc'][i]
-            is_enemy = df['is_enemy'][i]
-            is_player = df['is_player'][i]
-            is_event = df['is_event'][i]
-            id = df['id'][i]
-            id = id if pd.notna(id) else None
-
-            # Convert size from string to tuple of integers
-            size_str = df['size'][i]
-            size = tuple(map(int, size_str.strip('()').split(',')))
+        rows = zip(
+            columns['layer'], columns['coords'], columns['image_path'], columns['animation_path'],
+            columns['is_item'], columns['is_npc'], columns['is_enemy'], columns['is_player'],
+            columns['is_event'], columns['id'], columns['size']
+        )
 
+        for layer, coords, image_path, animation_path, is_item, is_npc, is_enemy, is_player, is_event, id, size in rows:
             cell = self._get_start_cell_coordinates(coords)
 
-            # Find index and inner index
-            index, inner_index = self._find_index_and_inner_index(image_path)
-
-            # Load image using cache
-            if image_path not in image_cache:
-                try:
-                    image_cache[image_path] = load(image_path).convert_alpha()
-                except Exception as e:
-                    image_cache[image_path] = load('assets\\graphics\\texture_error\\error.png').convert_alpha()  # Замените на путь к базовому изображению
-            image = image_cache[image_path]
-
-            # Load animation using cache if animation_path is not NaN
-            animation = None
-            if pd.notna(animation_path):
-                if animation_path not in animation_cache:
-                    animation_files = sorted(glob(os.path.join(animation_path, '*.png')))
-                    animation_cache[animation_path] = tuple(load(file).convert_alpha() for file in animation_files)
-                animation = animation_cache[animation_path]
+            image = image_cache[image_path] if image_path else self.image_loader.get_error_image()
+            animation = animation_cache[animation_path] if animation_path else None
 
             # Create CanvasObject and set attributes
             if self.is_editor:
+                # Find index and inner index
+                index, inner_index = self._find_index_and_inner_index(image_path)
+
                 canvas_obj = self.canvas_obj(
                     index=index,
                     inner_index=inner_index,
@@ -290,14 +380,20 @@ class SaveManager:
                     image=image,
                     image_path=image_path,
                     free_pos=coords,
-                    animation=animation
+                    animation=animation,
+                    ask_id=False
                 )
+
+                # The menu entry sets the defaults of new objects, an imported object keeps its saved ones
+                canvas_obj.layer = layer
+                canvas_obj.animation_dir = animation_path or ''
             else:
                 canvas_obj = self.canvas_obj(
                     layer=layer,
                     image=image,
                     pos=coords,
-                    animation=animation
+                    animation=animation,
+                    region=regions.get(image_path)
                 )
 
             canvas_obj.item = is_item
@@ -313,36 +409,30 @@ class SaveManager:
 
         return canvas_data
 
-    def import_colliders(self, path):
+    def build_colliders(self, columns):
         """
-        Import collider data from a CSV file.
+        Create collider objects from collider columns.
 
         Args:
-            path (str): The path to the CSV file.
+            columns (dict): The collider data by column.
 
         Returns:
-            dict: The imported collider data.
+            dict: The collider data.
         """
-        df = pd.read_csv(path)
-        image_cache = {}  # Dictionary for caching images
+        # Collider images are only shown in the editor
+        image_cache = self.image_loader.load(columns['image_path'])[0] if self.is_editor else {}
         collider_data = {}
 
-        for i in range(len(df)):
-            coords = tuple(json.loads(df['coords'][i]))
-            image_path = df['image_path'][i]
-            collider_type = df['collider_type'][i]
-
-            # Find index and inner index
-            index, inner_index = self._find_index_and_inner_index(image_path)
+        for coords, image_path, collider_type in zip(columns['coords'], columns['image_path'], columns['collider_type']):
             cell = self._get_start_cell_coordinates(coords)
 
-            # Load image using cache
-            if image_path not in image_cache:
-                image_cache[image_path] = load(image_path).convert_alpha()
-            image = image_cache[image_path]
-
             # Create CanvasObject and set attributes
             if self.is_editor:
+                # Find index and inner index
+                index, inner_index = self._find_index_and_inner_index(image_path)
+
+                image = image_cache[image_path] if image_path else self.image_loader.get_error_image()
+
                 collider_obj = self.canvas_obj(
                     index=index,
                     inner_index=inner_index,
@@ -351,9 +441,12 @@ class SaveManager:
                     image=image,  # Use cached image
                     image_path=image_path,
                     free_pos=coords,
-                    animation=None  # Colliders don't use animation
+                    animation=None,  # Colliders don't use animation
+                    ask_id=False
                 )
 
+                # Imported colliders keep layer 9 like the tiles keep their saved layer
+                collider_obj.layer = 9
                 collider_obj.collision_type = collider_type
 
                 collider_data[cell] = collider_obj
@@ -394,6 +487,9 @@ class SaveManager:
         """
         Export the entire scene to a directory.
 
+        The CSV files stay the authoring format, level.bin is the compiled
+        copy the game loads.
+
         Args:
             dir_path (str): The directory path.
             filename (str): The filename for the scene.
@@ -404,24 +500,43 @@ class SaveManager:
             print('Save Error')
             return
 
-        dir_path = os.path.join(dir_path, filename)
+        self.export_columns(
+            os.path.join(dir_path, filename),
+            self._get_tile_columns(canvas_data),
+            self._get_collider_columns(collider_data)
+        )
 
+    def export_columns(self, dir_path, tile_columns, collider_columns):
+        """
+        Export a scene from data already collected by column.
+
+        Args:
+            dir_path (str): The scene directory, created if missing.
+            tile_columns (dict): The tile data by tiles.csv column, coords and size as tuples.
+            collider_columns (dict): The collider data by colliders.csv column, coords as tuples.
+        """
         if not os.path.exists(dir_path):
             os.makedirs(dir_path)
 
         tiles_path = os.path.join(dir_path, 'tiles.csv')
-        self.export_tiles(tiles_path, canvas_data)
+        self.export_tiles(tiles_path, None, tile_columns)
 
         colliders_path = os.path.join(dir_path, 'colliders.csv')
-        self.export_colliders(colliders_path, collider_data)
+        self.export_colliders(colliders_path, None, collider_columns)
 
         settings_path = os.path.join(dir_path, 'settings.json')
         self.export_settings(settings_path)
 
+        compiled_path = os.path.join(dir_path, COMPILED_LEVEL_NAME)
+        write_level(compiled_path, tile_columns, collider_columns)
+
     def import_scene(self, dir_path, filename):
         """
         Import the entire scene from a directory.
 
+        Outside the editor level.bin is used when it is up to date with the
+        CSV files.
+
         Args:
             dir_path (str): The directory path.
             filename (str): The filename for the scene.
@@ -429,24 +544,36 @@ class SaveManager:
         Returns:
             list: The imported scene data.
         """
+        scene_path = os.path.join(dir_path, filename)
+
+        # Import settings
+        path = os.path.join(scene_path, 'settings.json')
+        if not os.path.exists(path):
+            return None
+        settings = self.import_settings(path)
+
+        # Import compiled level
+        if not self.is_editor and is_level_fresh(scene_path):
+            try:
+                tile_columns, collider_columns = read_level(os.path.join(scene_path, COMPILED_LEVEL_NAME))
+            except ValueError as e:
+                print(f"Warning: {e}, loading CSV files instead")
+            else:
+                return [self.build_tiles(tile_columns), settings, self.build_colliders(collider_columns)]
+
         data = []
 
         # Import tiles
-        path = os.path.join(dir_path, filename, 'tiles.csv')
+        path = os.path.join(scene_path, 'tiles.csv')
         if os.path.exists(path):
             data.append(self.import_tiles(path))
         else:
             return None
 
-        # Import settings
-        path = os.path.join(dir_path, filename, 'settings.json')
-        if os.path.exists(path):
-            data.append(self.import_settings(path))
-        else:
-            return None
+        data.append(settings)
 
         # Import colliders
-        path = os.path.join(dir_path, filename, 'colliders.csv')
+        path = os.path.join(scene_path, 'colliders.csv')
         if os.path.exists(path):
             data.append(self.import_colliders(path))
         else:
@@ -1,15 +1,65 @@
 """
 Global application settings
 """
+import os
+
 from src.utils import resource_path
 
 # Window dimensions
 WINDOW_WIDTH: int = 1280
 WINDOW_HEIGHT: int = 720
 
+# Size of the canvas the game draws into, the window scales it up. The canvas shows the same part of the level as
+# the window with the art scaled by RENDER_WIDTH / WINDOW_WIDTH, which should keep the same aspect ratio and turn
+# the tile size into whole pixels, like 1/2. The editor always draws at the window size.
+RENDER_WIDTH: int = WINDOW_WIDTH
+RENDER_HEIGHT: int = WINDOW_HEIGHT
+
+# Rendering backend, 'software' blits onto the display surface and 'texture' draws images uploaded once as
+# textures through the SDL renderer of the window. Without pygame._sdl2 the software backend is used.
+# The editor always uses the software backend.
+RENDER_BACKEND: str = 'software'
+
+# Frame time profiler, times the stages of every frame and writes a report to PROFILER_OUTPUT_DIR on exit
+PROFILER_ENABLED: bool = False
+PROFILER_WINDOW: int = 300  # Frames the overlay percentiles cover
+PROFILER_OVERLAY_KEY: str = 'f3'
+PROFILER_OVERLAY_INTERVAL: int = 30  # Frames between overlay refreshes
+PROFILER_OUTPUT_DIR: str = 'profiles'
+
+# Fixed timestep simulation, the game advances in ticks of 1 / SIMULATION_TICK_RATE seconds and drawing
+# interpolates between the last two ticks, so gameplay does not change with the frame rate
+SIMULATION_TICK_RATE: int = 60
+MAX_FRAME_TIME: float = 0.25  # Longest frame the simulation catches up on, a longer stall slows the game down
+FRAME_RATE_LIMIT: int = 60  # Frames drawn per second at most, 0 draws as fast as possible
+
+# Tick rate the player speeds, gravity and camera smoothing are given for, other tick rates scale them.
+PHYSICS_REFERENCE_RATE: int = 60
+
 # Application mode
 EDITOR_MODE: bool = False
 
+# Number of threads decoding images while a level loads
+IMAGE_LOADER_WORKERS: int = os.cpu_count() or 1
+
+# Width and height of the texture atlas sheets tile graphics are packed into
+ATLAS_SHEET_SIZE: int = 2048
+
+# Width and height of a level chunk in tiles, drawing only visits the chunks on screen
+CHUNK_SIZE: int = 16
+
+# Memory the pre-rendered static chunks may use, the least recently drawn chunks are dropped first.
+# Chunks on screen are kept even when they need more
+CHUNK_CACHE_BUDGET_MB: int = 64
+
+# Widest baked parallax strip, layers whose tiles only line up over a wider span are drawn tile by tile
+PARALLAX_STRIP_MAX_WIDTH: int = 8192
+
+# Level change transition, the shape is a key of src.transition.TRANSITION_SHAPES
+TRANSITION_SHAPE: str = 'iris'
+TRANSITION_SPEED: int = 1000  # Pixels of cover per second
+TRANSITION_MAX_DT: float = 1 / 30  # Longest step of one frame, a level load does not skip the animation
+
 # Player settings
 PLAYER_PATH: str = resource_path('assets/graphics/player')
 PLAYER_IMAGE_WIDTH: int = 103
@@ -0,0 +1,112 @@
+"""
+Cached sky and horizon rendering
+
+The sky, the horizon bands and the ground are drawn once into a tall surface
+for the current colors. Every frame then only fills the plain sky above and
+below it and blits the visible part, so a multi-stop sky gradient costs the
+same as a flat color. The surface is rebuilt whenever a color changes.
+"""
+import math
+
+import pygame
+
+# Horizon bands as (offset from the top of the ground, height) in horizon top color
+HORIZON_BANDS: tuple = ((-13, 2), (-7, 4), (0, 10))
+
+
+def get_gradient_color(stops, distance):
+    """
+    Get the color of a sky gradient at a distance above the horizon.
+
+    Args:
+        stops (list): The (distance above the horizon, color) stops sorted by distance.
+        distance (float): The distance above the horizon.
+
+    Returns:
+        pygame.Color: The interpolated color.
+    """
+    if distance <= stops[0][0]:
+        return pygame.Color(stops[0][1])
+
+    for (start, start_color), (end, end_color) in zip(stops, stops[1:]):
+        if distance <= end:
+            return pygame.Color(start_color).lerp(end_color, (distance - start) / (end - start))
+    return pygame.Color(stops[-1][1])
+
+
+class SkyRenderer:
+    """Draws the sky, horizon and ground from a surface cached per color set"""
+
+    def __init__(self, size, ground_height=None, scale=1):
+        """
+        Initialize the renderer, the surface is built on the first draw.
+
+        Args:
+            size (tuple): The size of the surface the sky is drawn on.
+            ground_height (int): The height of the ground below its top, None if it reaches down forever.
+            scale (float): Surface pixels per pixel of the ground position, the ground height, the horizon
+                bands and the sky gradient.
+        """
+        self.width, self.height = size
+        self.ground_height = ground_height
+        self.scale = scale
+        self.key = None
+        self.surface = None
+        self.top = 0  # Distance from the top of the surface to the top of the ground
+        self.top_color = None
+        self.bottom_color = None
+
+    def _render(self, sky_color, horizon_color, horizon_top_color, sky_gradient):
+        """Draw the sky, bands and ground into a new cached surface"""
+        stops = sorted((distance * self.scale, color) for distance, color in sky_gradient or ((0, sky_color),))
+        bands = [
+            (round(offset * self.scale), max(1, round(height * self.scale))) for offset, height in HORIZON_BANDS
+        ]
+        top_band = -min(offset for offset, _ in bands)
+        self.top = max(top_band, int(stops[-1][0]))
+
+        # An endless ground only needs one row below the bands, its color repeats downward
+        bands_bottom = max(offset + height for offset, height in bands)
+        ground_height = round(self.ground_height * self.scale) if self.ground_height is not None else bands_bottom + 1
+        self.surface = pygame.Surface((self.width, self.top + ground_height)).convert()
+
+        # Sky, one row per pixel above the ground
+        for row in range(self.top):
+            color = get_gradient_color(stops, self.top - row)
+            self.surface.fill(color, (0, row, self.width, 1))
+
+        # Ground and horizon bands
+        self.surface.fill(horizon_color, (0, self.top, self.width, ground_height))
+        for offset, height in bands:
+            self.surface.fill(horizon_top_color, (0, self.top + offset, self.width, height))
+
+        self.top_color = get_gradient_color(stops, self.top)
+        self.bottom_color = get_gradient_color(stops, 0) if self.ground_height is not None else pygame.Color(horizon_color)
+
+    def draw(self, surface, ground_y, sky_color, horizon_color, horizon_top_color, sky_gradient=None):
+        """
+        Draw the sky onto a surface.
+
+        Args:
+            surface (pygame.Surface): The surface to draw on.
+            ground_y (int): The screen position of the top of the ground.
+            sky_color (str): The sky color, used if there is no gradient.
+            horizon_color (str): The ground color.
+            horizon_top_color (str): The color of the horizon bands.
+            sky_gradient (list): Optional (distance above the horizon, color) stops of the sky.
+        """
+        key = (sky_color, horizon_color, horizon_top_color,
+               tuple(map(tuple, sky_gradient)) if sky_gradient else None)
+        if key != self.key:
+            self._render(sky_color, horizon_color, horizon_top_color, sky_gradient)
+            self.key = key
+
+        top = math.floor(ground_y * self.scale) - self.top
+        bottom = top + self.surface.get_height()
+
+        if top > 0:
+            surface.fill(self.top_color, (0, 0, self.width, top))
+        if top < self.height and bottom > 0:
+            surface.blit(self.surface, (0, top))
+        if bottom < self.height:
+            surface.fill(self.bottom_color, (0, bottom, self.width, self.height - bottom))
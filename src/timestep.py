@@ -0,0 +1,57 @@
+"""
+Fixed timestep accumulator
+
+The frame time is collected in an accumulator and spent in ticks of a fixed
+length, so the simulation advances the same way at any frame rate. Whatever
+is left over is the interpolation factor between the previous and the
+current tick for drawing.
+
+Moving objects keep their position as a float and draw from the pixel it
+falls in, so movement scaled down to short ticks is not lost to rounding
+and covers the same distance at any tick rate.
+"""
+from src.settings import SIMULATION_TICK_RATE, MAX_FRAME_TIME
+
+
+class FixedTimestep:
+    """Turns variable frame times into a number of fixed simulation ticks"""
+
+    def __init__(self, tick_rate=SIMULATION_TICK_RATE, max_frame_time=MAX_FRAME_TIME):
+        """
+        Initialize the accumulator.
+
+        Args:
+            tick_rate (int): The simulation ticks per second.
+            max_frame_time (float): The longest frame in seconds that is caught up on.
+        """
+        self.tick = 1 / tick_rate
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+
+    def advance(self, dt):
+        """
+        Add the time of a frame.
+
+        Args:
+            dt (float): The frame time in seconds.
+
+        Returns:
+            int: The number of ticks to simulate this frame.
+        """
+        # A long stall (loading, a dragged window) is dropped instead of replayed in a burst of ticks
+        self.accumulator += min(dt, self.max_frame_time)
+
+        ticks = 0
+        while self.accumulator >= self.tick:
+            self.accumulator -= self.tick
+            ticks += 1
+        return ticks
+
+    @property
+    def alpha(self):
+        """How far drawing is between the previous and the current tick, from 0 to 1"""
+        return self.accumulator / self.tick
+
+    def reset(self):
+        """Forget the time that was not simulated yet"""
+        self.accumulator = 0.0
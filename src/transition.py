@@ -0,0 +1,144 @@
+"""
+Level change transitions
+
+A transition covers the screen with a shape that grows while the next level
+loads and shrinks again once it is shown. Shapes are pluggable: each one only
+knows how to draw its cover for a progress between 0 and 1 onto a surface of
+any size.
+"""
+import math
+from abc import ABC, abstractmethod
+
+import pygame
+
+from src.backend import get_backend
+from src.dirty_rects import get_dirty_rects
+from src.settings import (
+    TRANSITION_SHAPE, TRANSITION_SPEED, TRANSITION_MAX_DT
+)
+
+class TransitionShape(ABC):
+    """Base class of the shapes a transition covers the screen with"""
+
+    @abstractmethod
+    def get_length(self, size):
+        """
+        Get the distance the cover travels until the screen is covered.
+
+        Args:
+            size (tuple): The size of the screen.
+
+        Returns:
+            float: The distance in pixels.
+        """
+
+    @abstractmethod
+    def draw(self, surface, color, progress):
+        """
+        Draw the cover onto a surface.
+
+        Args:
+            surface (pygame.Surface): The surface to cover, the shape scales to its size.
+            color (str): The color of the cover.
+            progress (float): How far the cover closed, 0 is nothing and 1 is the whole surface.
+        """
+
+
+class IrisShape(TransitionShape):
+    """A ring closing in on the center of the screen"""
+
+    def get_length(self, size):
+        """Radius of the circle through the corners of the screen"""
+        return math.hypot(size[0] / 2, size[1] / 2)
+
+    def draw(self, surface, color, progress):
+        """Draw the ring, a closed iris fills the surface"""
+        if progress >= 1:
+            surface.fill(color)
+            return
+
+        width, height = surface.get_size()
+        radius = self.get_length((width, height))
+        border_width = int(radius * progress)
+        if border_width > 0:
+            pygame.draw.circle(surface, color, (width / 2, height / 2), radius, border_width)
+
+
+class WipeShape(TransitionShape):
+    """A curtain drawn across the screen from left to right"""
+
+    def get_length(self, size):
+        """Width of the screen"""
+        return size[0]
+
+    def draw(self, surface, color, progress):
+        """Draw the covered part of the screen"""
+        width, height = surface.get_size()
+        surface.fill(color, (0, 0, math.ceil(width * min(progress, 1)), height))
+
+
+TRANSITION_SHAPES: dict = {
+    'iris': IrisShape,
+    'wipe': WipeShape,
+}
+
+
+class Transition:
+    """Handles level transition effects"""
+
+    def __init__(self, toggle_callback, shape=TRANSITION_SHAPE):
+        """
+        Initialize transition effect.
+
+        Args:
+            toggle_callback (callable): Called once when the screen is covered.
+            shape (str): The key of the shape in TRANSITION_SHAPES.
+        """
+        self.backend = get_backend()
+        self.toggle = toggle_callback
+        self.active = False
+        self.color = 'black'
+
+        size = self.backend.target.get_size()
+        self.shape = TRANSITION_SHAPES[shape]()
+        self.length = self.shape.get_length(size)
+        self.threshold = self.length + 100  # The screen stays covered for the last 100 px
+
+        self.border_width = 0
+        self.direction = 1
+
+    def display(self, dt):
+        """Update and display transition effect"""
+        if not self.active:
+            return
+
+        self._update_transition(dt)
+        self._draw_transition()
+        get_dirty_rects().full()
+
+    def _update_transition(self, dt):
+        """Update transition effect state"""
+        # The frame after a level change took as long as the load, it must not skip the animation
+        self.border_width += TRANSITION_SPEED * min(dt, TRANSITION_MAX_DT) * self.direction
+
+        if self.border_width >= self.threshold:
+            self.direction = -1
+            self.toggle()
+
+        if self.border_width < 0:
+            self._reset_transition()
+
+    def _reset_transition(self):
+        """Reset transition effect to initial state"""
+        self.active = False
+        self.border_width = 0
+        self.direction = 1
+
+    def _draw_transition(self):
+        """Draw transition effect"""
+        progress = self.border_width / self.length
+        if progress <= 0:
+            return
+
+        # Shapes draw with pygame.draw, onto the software canvas of the backend
+        self.shape.draw(self.backend.get_canvas(), self.color, progress)
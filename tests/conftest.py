@@ -0,0 +1,17 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+import pytest
+
+from src.asset_index import ROOT_PATH
+
+
+@pytest.fixture
+def display(monkeypatch):
+    """Open a hidden display from the project root, where the asset paths of the levels start"""
+    monkeypatch.chdir(ROOT_PATH)
+    pygame.init()
+    yield pygame.display.set_mode((1, 1))
+    pygame.quit()
@@ -0,0 +1,43 @@
+import pygame
+import pytest
+
+from src import backend, dirty_rects
+
+
+@pytest.fixture
+def texture_backend(monkeypatch):
+    """A texture backend with its own dirty rectangle tracker"""
+    if backend.video is None:
+        pytest.skip('pygame._sdl2 is not available')
+
+    monkeypatch.setattr(backend, '_backend', None)
+    monkeypatch.setattr(dirty_rects, '_dirty_rects', dirty_rects.DirtyRects((1280, 720)))
+    pygame.init()
+    yield backend.create_backend((1280, 720), name='texture')
+    pygame.quit()
+
+
+def draw_frame(texture_backend, rects):
+    """Draw a blue frame with red canvas rectangles and read it back"""
+    texture_backend.target.fill('blue')
+    for rect in rects:
+        dirty_rects.get_dirty_rects().add(texture_backend.get_canvas().fill('red', rect))
+    texture_backend.present()
+    return texture_backend.renderer.to_surface()
+
+
+def test_texture_backend_uploads_changed_canvas_areas(texture_backend):
+    """Canvas areas drawn in one frame show in place and are gone in the next frames"""
+    draw_frame(texture_backend, [])
+
+    frame = draw_frame(texture_backend, [pygame.Rect(100, 100, 50, 50)])
+    assert frame.get_at((120, 120)) == pygame.Color('red')
+    assert frame.get_at((10, 10)) == pygame.Color('blue')
+
+    frame = draw_frame(texture_backend, [pygame.Rect(300, 300, 10, 10)])
+    assert frame.get_at((120, 120)) == pygame.Color('blue')
+    assert frame.get_at((305, 305)) == pygame.Color('red')
+
+    frame = draw_frame(texture_backend, [])
+    assert frame.get_at((305, 305)) == pygame.Color('blue')
+    assert dirty_rects.get_dirty_rects().rects == []
@@ -0,0 +1,33 @@
+import pygame
+
+from src.game.chunks import ChunkCache
+from src.game.level import TileObject
+
+
+def create_chunk(x):
+    """Create a chunk holding one static 64 x 64 tile"""
+    return [TileObject(image=pygame.Surface((64, 64), pygame.SRCALPHA), pos=(x, 0))]
+
+
+def test_chunk_cache_keeps_chunks_on_screen(display):
+    """Chunks drawn in the current frame stay baked even when they need more than the budget"""
+    cache = ChunkCache(64 * 64 * 4)
+    chunks = {key: create_chunk(key * 64) for key in range(3)}
+
+    first = [cache.get(key, chunk) for key, chunk in chunks.items()]
+    assert len(cache.entries) == 3
+
+    cache.next_frame()
+    assert [cache.get(key, chunk) for key, chunk in chunks.items()] == first
+
+
+def test_chunk_cache_evicts_chunks_off_screen(display):
+    """The least recently drawn chunks of earlier frames are dropped down to the budget"""
+    cache = ChunkCache(64 * 64 * 4)
+    cache.get(0, create_chunk(0))
+    cache.get(1, create_chunk(64))
+
+    cache.next_frame()
+    cache.get(2, create_chunk(128))
+    assert list(cache.entries) == [2]
+    assert cache.used == 64 * 64 * 4
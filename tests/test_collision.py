@@ -0,0 +1,72 @@
+from benchmarks.level_render import ScriptedKeys
+from src.editor.settings import TILE_SIZE
+from src.game.collision import CollisionWorld
+from src.game.level import Collider
+from src.game.player import Player
+
+TICK_RATE = 2
+COLUMNS = 30
+
+
+class UnsweptWorld(CollisionWorld):
+    """Collision world that moves without sweeping"""
+
+    def sweep(self, start, end):
+        return end
+
+
+class UnsteppedPlayer(Player):
+    """Player that moves a whole tick in one step, leaving thin edges to the sweep"""
+
+    def _get_substeps(self, tile_size, dt):
+        return 1
+
+
+def create_platform():
+    """Create a row of colliders whose down edges form a platform at y = TILE_SIZE, walled on the right"""
+    return [Collider(9, (column * TILE_SIZE, 0), 'rd' if column == COLUMNS - 1 else 'd', TILE_SIZE)
+            for column in range(COLUMNS)]
+
+
+def create_player(player_class=Player):
+    """Create a player falling at terminal velocity far above the platform"""
+    player = player_class()
+    player.start_width = 0
+    player.end_width = COLUMNS * TILE_SIZE * 2
+    player.rect.midbottom = (TILE_SIZE * 2, -20 * TILE_SIZE)
+    player.direction.y = player.terminal_velocity
+    return player
+
+
+def play(player, world, keys, seconds):
+    """Update the player at the low tick rate with the same keys held"""
+    for _ in range(seconds * TICK_RATE):
+        player.event_loop(keys)
+        player.update(world, 1 / TICK_RATE)
+
+
+def test_sweep_stops_fall_onto_thin_platform(display):
+    """A tick falls much further than the platform is thick and the sweep still lands the player on it"""
+    player = create_player()
+    play(player, CollisionWorld(TILE_SIZE, create_platform()), ScriptedKeys(()), 3)
+    assert player.rect.bottom == TILE_SIZE
+    assert player.on_ground
+
+
+def test_sweep_alone_stops_fall_onto_thin_platform(display):
+    """Without substeps a tick moves the player further than its height and only the sweep stops it"""
+    swept, unswept = create_player(UnsteppedPlayer), create_player(UnsteppedPlayer)
+    play(swept, CollisionWorld(TILE_SIZE, create_platform()), ScriptedKeys(()), 3)
+    play(unswept, UnsweptWorld(TILE_SIZE, create_platform()), ScriptedKeys(()), 3)
+    assert swept.rect.bottom == TILE_SIZE
+    assert unswept.rect.bottom > TILE_SIZE * 2
+
+
+def test_sweep_stops_walk_into_thin_wall(display):
+    """Walking on the platform stops at the wall, even from a tick that starts resting against it"""
+    player = create_player()
+    world = CollisionWorld(TILE_SIZE, create_platform())
+    play(player, world, ScriptedKeys(()), 3)
+    play(player, world, ScriptedKeys(('d',)), 10)
+    assert player.rect.right == COLUMNS * TILE_SIZE
+    assert player.rect.bottom == TILE_SIZE
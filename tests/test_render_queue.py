@@ -0,0 +1,32 @@
+import pygame
+
+from src.render_queue import RenderQueue
+from src.sky import SkyRenderer
+
+
+def test_scaled_queue_draws_the_same_view(display):
+    """Images and positions are scaled to the canvas, so touching tiles still touch"""
+    canvas = pygame.Surface((640, 360))
+    queue = RenderQueue(canvas, 0.5)
+    tile = pygame.Surface((64, 64), pygame.SRCALPHA)
+    tile.fill('red')
+
+    queue.add(tile, (101, 201), dirty=True)
+    queue.add(tile, (165, 201), dirty=True)
+    queue.flush()
+
+    assert queue.scaled[tile].get_size() == (32, 32)
+    assert canvas.get_at((50, 100)) == pygame.Color('red')
+    assert canvas.get_at((113, 131)) == pygame.Color('red')
+    for outside in ((49, 100), (114, 100), (82, 99), (82, 132)):
+        assert canvas.get_at(outside) == pygame.Color('black')
+
+
+def test_scaled_sky_puts_the_ground_at_the_scaled_position(display):
+    """The ground and the horizon bands of a scaled sky land where the full size ones do, scaled"""
+    full, half = pygame.Surface((1280, 720)), pygame.Surface((640, 360))
+    SkyRenderer(full.get_size(), 738).draw(full, 400, 'blue', 'green', 'white')
+    SkyRenderer(half.get_size(), 738, 0.5).draw(half, 400, 'blue', 'green', 'white')
+
+    for y in (0, 380, 386, 390, 399, 410, 719):
+        assert half.get_at((320, y // 2)) == full.get_at((640, y))
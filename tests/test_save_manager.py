@@ -0,0 +1,38 @@
+import csv
+import os
+from collections import Counter
+
+import pytest
+
+from src.editor.editor import CanvasObject
+from src.save_manager import SaveManager
+
+LEVEL_PATH = 'assets/editor/saves/level_1'
+
+
+def read_rows(path):
+    """Read the rows of a CSV file, the export orders them by layer so they are compared as a multiset"""
+    with open(path, newline='', encoding='utf-8') as file:
+        return Counter(map(tuple, csv.reader(file)))
+
+
+@pytest.mark.parametrize('name', ['tiles.csv', 'colliders.csv'])
+def test_editor_round_trip_keeps_level(display, tmp_path, name):
+    """Saving a level in the editor without changes must not change it"""
+    save_manager = SaveManager(CanvasObject, None, True)
+    canvas_data, _, collider_data = save_manager.import_scene(LEVEL_PATH, '')
+    save_manager.export_scene(str(tmp_path), 'level', canvas_data, collider_data)
+
+    original = read_rows(os.path.join(LEVEL_PATH, name))
+    exported = read_rows(os.path.join(tmp_path, 'level', name))
+    assert original - exported == Counter()
+    assert exported - original == Counter()
+
+
+def test_editor_import_keeps_saved_layers(display):
+    """Menu defaults of new objects do not override the layers of imported ones"""
+    save_manager = SaveManager(CanvasObject, None, True)
+    canvas_data, _, collider_data = save_manager.import_scene(LEVEL_PATH, '')
+
+    assert all(canvas.layer == layer for layer, objects in canvas_data.items() for canvas in objects.values())
+    assert all(collider.layer == 9 for collider in collider_data.values())
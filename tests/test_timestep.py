@@ -0,0 +1,39 @@
+import pytest
+
+from benchmarks.level_render import ScriptedKeys
+from src.editor.settings import TILE_SIZE
+from src.game.camera import Camera
+from src.game.collision import CollisionWorld
+from src.game.level import Collider
+from src.game.player import Player
+from src.timestep import FixedTimestep
+
+
+def play(tick_rate):
+    """Walk, sprint and stop on a long floor, returning where the player and the camera end up"""
+    world = CollisionWorld(TILE_SIZE, [Collider(9, (column * TILE_SIZE, 0), 'd', TILE_SIZE) for column in range(100)])
+    player, camera = Player(), Camera()
+    player.end_width = 100 * TILE_SIZE
+    player.rect.midbottom = (TILE_SIZE * 2, TILE_SIZE)
+
+    for names, seconds in (((), 1), (('d',), 2), (('d', 'left shift'), 1), ((), 1)):
+        keys = ScriptedKeys(names)
+        for _ in range(seconds * tick_rate):
+            player.event_loop(keys)
+            player.update(world, 1 / tick_rate)
+            camera.tick(player, 1 / tick_rate)
+    return player.rect.topleft, camera.viewport.topleft
+
+
+def test_fixed_timestep_keeps_the_remainder():
+    """Frame time that does not fill a tick is carried over and shows up in alpha"""
+    timestep = FixedTimestep(tick_rate=60)
+    assert timestep.advance(1.5 / 60) == 1
+    assert timestep.alpha == pytest.approx(0.5)
+    assert timestep.advance(0.5 / 60) == 1
+
+
+@pytest.mark.parametrize('tick_rate', [30, 120, 144, 240])
+def test_movement_is_independent_of_tick_rate(display, tick_rate):
+    """Movement scaled to short ticks keeps its fractions and ends where it does at the reference rate"""
+    assert play(tick_rate) == play(60)